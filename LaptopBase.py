@@ -1,9 +1,14 @@
-import pandas as pd
+from __future__ import annotations
 from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Union
+from typing import Union, TYPE_CHECKING
 import logging
 
+#pandas та сховище імпортуються при першому зверненні до даних,
+#щоб бот міг почати приймати повідомлення якомога раніше
+if TYPE_CHECKING:
+    import pandas as pd
+
 @dataclass
 class LaptopItem:
 
@@ -40,9 +45,114 @@ class LaptopItem:
 
 
 class LaptopBase:
-    def __init__(self, path: str):
-        self.path = Path(path)
-        self.df = self.load()
+    def __init__(self, path: str = None, storage=None, table: str = "hot_deals", config=None, journal=None):
+        self.path = Path(path) if path else None
+        self.table = table
+        self.config = config
+        self._storage = storage
+        self._journal = journal
+        self._df = None
+        #версія таблиці в сховищі, з якої завантажено df (для пропуску зайвих перезавантажень)
+        self._version = None
+        #відсортовані позиції рядків, що не є спамом (для навігації по картках)
+        self._valid = None
+        #id в порядку рядків та зворотний словник id -> позиція (для кнопок бота)
+        self._ids = None
+        self._positions = None
+        #лічильник змін порядку рядків; кнопки бота несуть його разом з id
+        self._data_version = 0
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from storage import get_storage, CsvStorage
+            self._storage = get_storage(self.config) if self.config is not None else CsvStorage({self.table: self.path})
+        return self._storage
+
+    @property
+    def journal(self):
+
+        """
+        Журнал позначок spam/is_new (див. flag_journal.py). Без config і без
+        явно переданого журналу позначки пишуться прямо в сховище.
+        """
+
+        if self._journal is None and self.config is not None:
+            from flag_journal import FlagJournal
+            self._journal = FlagJournal(
+                self.config.data.get('path_flag_journal', 'data/flags.jsonl'),
+                flush_delay=self.config.data.get('flag_flush_delay', 2.0)
+            )
+        return self._journal
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self.df = self.load()
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame):
+        self._df = value
+        self._reset_index_cache()
+
+    def _reset_index_cache(self):
+        self._valid = None
+        self._ids = None
+        self._positions = None
+        self._data_version += 1
+
+    @property
+    def data_version(self) -> int:
+        return self._data_version
+
+    @property
+    def valid_positions(self):
+
+        """
+        Відсортований масив позицій рядків без позначки spam. Перебудовується
+        лише після зміни даних (новий df, update, reload), а add_to_spam
+        видаляє з нього одну позицію.
+        """
+
+        if self._valid is None:
+            import numpy as np
+
+            df = self.df
+            if 'spam' in df.columns:
+                self._valid = np.flatnonzero(~df['spam'].fillna(False).astype(bool).to_numpy())
+            else:
+                self._valid = np.arange(len(df))
+
+        return self._valid
+
+    def _build_id_index(self):
+
+        """
+        Масив id у порядку рядків і словник id -> позиція. Будуються один раз
+        після зміни даних, тож пошук картки за id з кнопки — O(1).
+        """
+
+        import numpy as np
+
+        df = self.df
+        if 'id' in df.columns:
+            self._ids = df['id'].astype(str).to_numpy(dtype=object)
+        else:
+            self._ids = np.array([], dtype=object)
+
+        #при дублікатах id перемагає перший рядок
+        self._positions = dict(zip(self._ids[::-1], range(len(self._ids) - 1, -1, -1)))
+
+    def id_at(self, index: int) -> str:
+        if self._ids is None:
+            self._build_id_index()
+        return self._ids[index]
+
+    def position_of(self, ad_id: str) -> int | None:
+        if self._positions is None:
+            self._build_id_index()
+        return self._positions.get(str(ad_id))
 
     def __len__(self):
         return len(self.df)
@@ -51,92 +161,206 @@ class LaptopBase:
         return self.df[key]
 
     def load(self):
-        if not self.path.exists():
-            return pd.DataFrame()
         try:
-            return pd.read_csv(self.path)
+            version = self.storage.version(self.table)
+            df = self.storage.read(self.table)
+            self._version = version
+
+            if self.journal is not None:
+                df = self.journal.overlay(df)
+            return df
 
         except Exception as e:
+            logging.error(f"Не вдалося завантажити таблицю {self.table}: {e}", exc_info=True)
+            import pandas as pd
             return pd.DataFrame()
 
-    def save(self):
-        if not self.path.exists():
-            pd.DataFrame().to_csv(self.path, index=False)
+    def _sync_version(self):
+        #після власного запису дані в пам'яті вже відповідають сховищу
+        try:
+            self._version = self.storage.version(self.table)
+        except Exception:
+            self._version = None
+
+    def save(self, df: pd.DataFrame = None):
+
+        """
+        Записує таблицю в сховище. Для запису у фоновому потоці передається
+        знімок df, зроблений у циклі подій, щоб потік не читав df, який
+        тим часом замінює або змінює бот.
+        """
+
+        self.storage.write(self.table, self.df if df is None else df)
+        self._sync_version()
+
+    def flush(self):
+        #дописує на диск позначки, що ще чекають у буфері журналу
+        if self._journal is not None:
+            self._journal.flush()
 
-        self.df.to_csv(self.path,index=False)
+    def read(self) -> pd.DataFrame:
+        #завантаження без заміни df, щоб його можна було виконати у фоновому потоці
+        return self.load().reset_index(drop=True)
 
     def reload(self):
-        self.df = self.load()
-        self.df = self.df.reset_index(drop=True)
+        self.df = self.read()
+
+    def _set_value(self, ad_id: str, column: str, value, df: pd.DataFrame = None):
+        in_sync = self._version is not None and self.storage.version(self.table) == self._version
+        self.storage.set_value(self.table, ad_id, column, value, df=df)
+
+        #зовнішню зміну, яку ми ще не завантажили, не можна позначати як прочитану
+        if in_sync:
+            self._sync_version()
+
+    def update(self, new_bd: pd.DataFrame = None, persist: bool = True) -> list:
+
+        """
+        Оновлює базу новими гарячими пропозиціями, зберігаючи позначки spam/is_new.
+
+        Якщо new_bd не задано, таблиця читається зі сховища лише тоді, коли її
+        версія змінилась з останнього завантаження чи запису. До df в пам'яті
+        застосовуються тільки додані, видалені та змінені id.
+
+        Args:
+            new_bd (pd.DataFrame): Нові пропозиції з find_hot_deals. Якщо не задано,
+                читаються зі сховища.
+            persist (bool): Чи записувати результат одразу (конвеєр зберігає його у фоні).
+
+        Returns:
+            list: ID, яких до цього оновлення в базі не було (порожній, якщо нічого не додано).
+        """
 
-    def update(self):
         try:
-            new_bd = self.load()
+            if new_bd is None:
+                version = self.storage.version(self.table)
+                if self._df is not None and version is not None and version == self._version:
+                    return []
+                new_bd = self.load()
+            else:
+                new_bd = new_bd.copy()
+                if self.journal is not None:
+                    new_bd = self.journal.overlay(new_bd)
 
             if new_bd.empty:
-                return
+                return []
             if self.df.empty:
                 self.df = new_bd
-                self.save()
-                return 
-            
-            self.df.drop_duplicates(subset=['id'], keep='first', inplace=True)
-            new_bd.drop_duplicates(subset=['id'], keep='first', inplace=True)
-
-            self.df['id'] = self.df['id'].astype(str)
-            new_bd['id'] = new_bd['id'].astype(str)
-
-            self.df.set_index('id', inplace=True)
-            new_bd.set_index('id', inplace=True)
-
-            if 'spam' in self.df.columns and 'spam' in new_bd.columns:
-                new_bd.update(self.df[['spam']])
-            
-            if 'is_new' in self.df.columns and 'is_new' in new_bd.columns:
-                new_bd.update(self.df[['is_new']])
+                if persist:
+                    self.save()
+                return list(new_bd['id'].drop_duplicates())
 
-            new_bd.reset_index(inplace=True)
+            added, removed, changed = self._apply_delta(new_bd)
+            if not (len(added) or len(removed) or len(changed)):
+                return []
 
-            self.df = new_bd
-            self.save()
+            if persist:
+                self.save()
 
-            logging.info(f"База даних успішно оновлена.")
+            logging.info(f"База даних оновлена: додано {len(added)}, видалено {len(removed)}, змінено {len(changed)}.")
+            return list(added)
             
         except Exception as e:
             logging.error(f"Помилка оновлення бази: {e}",exc_info=True)
             if 'id' not in self.df.columns: 
                  self.df.reset_index(inplace=True)
+            self._reset_index_cache()
+            return []
+
+    def _apply_delta(self, new_bd: pd.DataFrame) -> tuple:
+
+        """
+        Зводить df до new_bd: рядки з незмінними даними беруться з поточного df,
+        нові та змінені — з new_bd, а позначки spam/is_new зберігаються.
+        Порядок рядків — як у new_bd.
+
+        Returns:
+            tuple: Індекси доданих, видалених та змінених id.
+        """
+
+        import pandas as pd
+        from storage import apply_schema
+
+        current = self.df.drop_duplicates(subset=['id'], keep='first').set_index('id')
+        new_bd = new_bd.drop_duplicates(subset=['id'], keep='first').set_index('id')
+
+        flags = [col for col in ('spam', 'is_new') if col in current.columns and col in new_bd.columns]
+        data_cols = [col for col in new_bd.columns if col not in flags]
+
+        common = new_bd.index.intersection(current.index)
+        added = new_bd.index.difference(current.index)
+        removed = current.index.difference(new_bd.index)
+
+        if set(current.columns) != set(new_bd.columns):
+            changed = common
+        else:
+            old = current.loc[common, data_cols].astype(object)
+            new = new_bd.loc[common, data_cols].astype(object)
+            differs = (old != new) & ~(old.isna() & new.isna())
+            changed = common[differs.any(axis=1).to_numpy()]
+
+        if not (len(added) or len(removed) or len(changed)):
+            return added, removed, changed
+
+        fresh = new_bd.loc[changed.append(added)]
+        if flags and len(changed):
+            fresh.update(current.loc[changed, flags])
+
+        kept = current.loc[common.difference(changed), list(new_bd.columns)]
+        result = pd.concat([kept, fresh]).reindex(new_bd.index)
+
+        self.df = apply_schema(result.reset_index())
+        return added, removed, changed
 
 
     def get_valid_index(self, index: int, direction: int = 1) -> int:
+
+        """
+        Найближча до index картка без спаму в напрямку direction (бінарний пошук
+        по valid_positions). Якщо в цьому напрямку таких немає — переходить
+        на протилежний кінець списку.
+        """
+
         try:
-            if self.df.empty:
+            valid = self.valid_positions
+            if not len(valid):
                 return 0
-            
-            max_idx = len(self.df) - 1
 
-            curr = max(0,min(index,max_idx))
+            curr = max(0, min(index, len(self.df) - 1))
 
-            while 0 <= curr <= max_idx:
-                if not self.df.iloc[curr].get('spam',True):
-                    return curr
-                curr += direction
+            if direction >= 0:
+                pos = int(valid.searchsorted(curr, side='left'))
+                return int(valid[pos]) if pos < len(valid) else int(valid[0])
 
-            for i in range(max_idx)[::direction]:
-                if not self.df.iloc[i].get('spam',False):
-                    return i
-                   
-            return 0
+            pos = int(valid.searchsorted(curr, side='right')) - 1
+            return int(valid[pos]) if pos >= 0 else int(valid[-1])
             
         except:
             return 0
         
 
     def add_to_spam(self, index: int):
+        #df.loc з неіснуючим індексом дописав би новий порожній рядок
+        if index not in self.df.index:
+            logging.warning(f"Рядка {index} немає в таблиці {self.table}, позначку спаму пропущено.")
+            return
+
         try:
             self.df.loc[index,'spam'] = True
-        except:
-            pass
+
+            if self._valid is not None:
+                pos = int(self._valid.searchsorted(index))
+                if pos < len(self._valid) and self._valid[pos] == index:
+                    import numpy as np
+                    self._valid = np.delete(self._valid, pos)
+
+            if self.journal is not None:
+                self.journal.set(self.df.loc[index, 'id'], 'spam', True)
+            else:
+                self._set_value(self.df.loc[index, 'id'], 'spam', True, df=self.df)
+        #відсутній рядок або помилка запису в сховище (ОС, pyarrow, типи колонок)
+        except (KeyError, IndexError, ValueError, TypeError, OSError) as e:
+            logging.error(f"Не вдалося позначити рядок {index} таблиці {self.table} як спам: {e}", exc_info=True)
 
     def is_new(self, index: int) -> bool:
         if 'is_new' not in self.df:
@@ -150,3 +374,9 @@ class LaptopBase:
             
         self.df.loc[index,'is_new'] = False
 
+        if self.journal is not None:
+            self.journal.set(self.df.loc[index, 'id'], 'is_new', False)
+        #для CSV зберігання кожного перегляду означало б перезапис файлу
+        elif self.storage.supports_row_updates:
+            self._set_value(self.df.loc[index, 'id'], 'is_new', False)
+
@@ -1,56 +1,107 @@
 import pandas as pd
 import logging
 from config_manager import ConfigManager
+from storage import get_storage, apply_schema, LISTINGS, HOT_DEALS, ANALYSIS_COLUMNS
+from history import get_history
+from market_stats import MarketStats
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%H:%M:%S'
-)
+#стан статистики ринку живе між циклами, щоб не читати його з диска щоразу
+_market_stats = None
 
-def find_hot_deals():
+
+def get_market_stats(config) -> MarketStats:
+    global _market_stats
+
+    path = config.data.get('path_market_stats', 'data/market_stats.json')
+    if _market_stats is None or str(_market_stats.path) != str(path):
+        _market_stats = MarketStats(path)
+
+    return _market_stats
+
+
+def find_hot_deals(listings: pd.DataFrame = None, config: ConfigManager = None, persist: bool = True) -> pd.DataFrame:
 
     """
     Аналізує зібрані дані про ноутбуки для пошуку найбільш вигідних пропозицій на ринку.
     
     Алгоритм роботи:
-    1. Завантажує дані з основної бази (laptops.csv).
+    1. Завантажує з основної бази (таблиця listings) лише колонки, потрібні для статистики.
     2. Фільтрує "сміття": видаляє спам та оголошення з невизначеною моделлю.
-    3. Групує ноутбуки за ідентичними характеристиками (модель, RAM, диск, процесор).
-    4. Розраховує медіанну ціну для кожної групи (за умови, що в групі > 4 оголошень).
+    3. Групує ноутбуки за ідентичними характеристиками (модель, RAM, диск).
+    4. Розраховує медіанну ціну для кожної групи (за умови, що в групі > 4 оголошень)
+       за оголошеннями, які бачили за history_window_days днів; між циклами в ринковий
+       набір вносяться лише нові, переоцінені та виключені оголошення, а медіани
+       перераховуються лише для зачеплених груп.
     5. Обчислює Deal Score (відсоток відхилення ціни від медіани).
-    6. Відбирає "Гарячі пропозиції" — оголошення, ціна яких нижча за ринкову на 15-35%.
-    7. Зберігає результат у окремий файл (hot_deals.csv) для подальшої відправки ботом.
+    6. Відбирає "Гарячі пропозиції" — оголошення, ціна яких нижча за ринкову на 15-35%,
+       і дочитує повні рядки лише для них.
+    7. Зберігає результат у окреме сховище (hot_deals) для подальшої відправки ботом.
+
+    Args:
+        listings (pd.DataFrame): Свіжі оголошення від scrape_listings. Якщо задано,
+            основна база з диска не читається.
+        config (ConfigManager): Вже завантажений конфіг.
+        persist (bool): Чи записувати hot_deals та статистику ринку одразу. Конвеєр
+            передає False і зберігає результат у фоні (див. pipeline.py).
     """
 
-    config = ConfigManager()
-    path_data = config.data.get("path_data", "data/laptops.csv")
+    config = config or ConfigManager()
+    storage = get_storage(config)
 
     min_discont = config.data["min_deal_score"]
     max_dictont = config.data["max_deal_score"]
     
     try:
-        raw_data = pd.read_csv(path_data)
+        #для статистики достатньо кількох колонок, решта читається лише для знайдених пропозицій
+        if listings is None:
+            raw_data = storage.read(LISTINGS, columns=ANALYSIS_COLUMNS)
+        else:
+            listings = apply_schema(listings.copy())
+            raw_data = listings[[col for col in ANALYSIS_COLUMNS if col in listings.columns]]
        
-        mask = (raw_data.get("spam", False) != True) & (raw_data['category'] != 'unKnown') & (raw_data['price'] > 0)
+        mask = ((raw_data.get("spam", False) != True) & (raw_data['category'] != 'unKnown') & (raw_data['price'] > 0)).fillna(False)
         target_data = raw_data[mask]
 
-        group_cols = ['category', 'ram', 'disk_v']
-        stats = target_data.groupby(group_cols, as_index=False)['price'].agg(['median', 'count'])
-        
-        target_data = target_data.merge(stats, on=group_cols)
-        
+        #медіана рахується за всіма оголошеннями, які бачили за останні history_window_days днів:
+        #ринковий набір живе в MarketStats, а історія читається лише для його першого заповнення
+        window_days = config.data.get('history_window_days', 30)
+        market_stats = get_market_stats(config)
+
+        if market_stats.empty and window_days:
+            history = get_history(config).latest_prices(window_days)
+            if not history.empty:
+                history_mask = (history.get('spam', False) != True) & (history['category'] != 'unKnown') & (history['price'] > 0)
+                history = history[history_mask.fillna(False)]
+                seen = pd.to_datetime(history['scraped_on']).map(pd.Timestamp.timestamp)
+                market_stats.update(history.assign(seen=seen.to_numpy(dtype='float64')), window_days=window_days)
+
+        #у статистику потрапляють лише нові, переоцінені та виключені оголошення
+        touched = market_stats.update(target_data, raw_data.loc[~mask, 'id'], window_days)
+        if persist:
+            market_stats.save()
+        logging.info(f"Оновлено статистику {len(touched)} з {len(market_stats.stats)} груп.")
 
+        median, count = market_stats.lookup(target_data['id'])
+        target_data = target_data.assign(median=median, count=count.astype('int64'))
         target_data = target_data[target_data['count'] > 4].copy()
         target_data['deal_score'] = 1 - (target_data['price'] / target_data['median'])
 
-        hot_deals = target_data[target_data['deal_score'].between(min_discont, max_dictont)].copy()
+        scores = target_data.loc[target_data['deal_score'].between(min_discont, max_dictont), ['id', 'median', 'count', 'deal_score']]
+
+        if listings is None:
+            details = storage.read(LISTINGS, ids=scores['id'])
+        else:
+            details = listings[listings['id'].isin(scores['id'])]
+
+        details = details.drop_duplicates(subset=['id'])
+        hot_deals = details.merge(scores, on='id')
         
         hot_deals.loc[:, "is_new"] = True
         hot_deals = hot_deals.sort_values(by=['deal_score','category'], ascending=False)
 
         hot_deals.reset_index(drop=True, inplace=True)
-        hot_deals.to_csv('data/hot_deals.csv', index=False)
+        if persist:
+            storage.write(HOT_DEALS, hot_deals)
         logging.info(f"Знайдено {len(hot_deals[hot_deals['is_new']==True])} гарячих пропозицій!")
         return hot_deals
         
@@ -58,4 +109,11 @@ def find_hot_deals():
 
         logging.error(f"Помилка аналізу: {e}")
 
-find_hot_deals()
\ No newline at end of file
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+    find_hot_deals()
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from config_manager import ConfigManager
+
+
+class PhotoCache:
+
+    """
+    Кеш file_id, які Telegram повертає після першого надсилання фото.
+
+    Ключ — URL зображення з OLX. Повторне надсилання за file_id не змушує
+    сервери Telegram знову завантажувати та перекодовувати картинку.
+    Словник зберігається в JSON з затримкою flush_delay після змін.
+    """
+
+    def __init__(self, path: str, flush_delay: float = 5.0):
+        self.path = Path(path)
+        self.flush_delay = flush_delay
+
+        self.file_ids = {}
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.file_ids = json.load(f)
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати кеш фото {self.path}: {e}")
+
+    def get(self, url: str) -> str:
+        #якщо file_id ще немає, Telegram отримає звичайне посилання
+        return self.file_ids.get(url, url)
+
+    def remember(self, url: str, message) -> None:
+
+        """
+        Запам'ятовує file_id найбільшого розміру фото з відповіді Telegram.
+        """
+
+        photo = getattr(message, 'photo', None)
+        if not url or not photo:
+            return
+
+        file_id = photo[-1].file_id
+        if self.file_ids.get(url) == file_id:
+            return
+
+        with self._lock:
+            self.file_ids[url] = file_id
+            self._dirty = True
+        self._schedule_flush()
+
+    def forget(self, url: str) -> None:
+        with self._lock:
+            if self.file_ids.pop(url, None) is not None:
+                self._dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(self.flush_delay, lambda: loop.create_task(asyncio.to_thread(self.flush)))
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self.file_ids)
+            self._dirty = False
+
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Не вдалося зберегти кеш фото {self.path}: {e}")
+            self._dirty = True
+
+
+class CardLRU:
+
+    """
+    LRU готових карток (фото, підпис, клавіатура) для get_laptops_menu.
+
+    Ключ включає id оголошення та версію порядку рядків LaptopBase, тож
+    після оновлення бази старі картки просто перестають запитуватись
+    і витісняються.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._cards = OrderedDict()
+
+    def get(self, key):
+        card = self._cards.get(key)
+        if card is not None:
+            self._cards.move_to_end(key)
+        return card
+
+    def put(self, key, card) -> None:
+        self._cards[key] = card
+        self._cards.move_to_end(key)
+        while len(self._cards) > self.maxsize:
+            self._cards.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._cards
+
+    def clear(self):
+        self._cards.clear()
+
+
+_photo_cache = None
+_card_cache = None
+
+
+def get_photo_cache(config: ConfigManager = None) -> PhotoCache:
+    global _photo_cache
+
+    if _photo_cache is None:
+        config = config or ConfigManager()
+        _photo_cache = PhotoCache(
+            config.data.get('path_photo_cache', 'data/photo_ids.json'),
+            flush_delay=config.data.get('photo_cache_flush_delay', 5.0)
+        )
+
+    return _photo_cache
+
+
+def get_card_cache(config: ConfigManager = None) -> CardLRU:
+    global _card_cache
+
+    if _card_cache is None:
+        config = config or ConfigManager()
+        _card_cache = CardLRU(maxsize=config.data.get('card_cache_size', 64))
+
+    return _card_cache
@@ -51,11 +51,56 @@ class ConfigManager:
                         },
                         "image_url": {
                             "data-testid": "swiper-image"
+                        },
+                        "total_count": {
+                            "data-testid": "total-count"
+                        },
+                        "pagination": {
+                            "data-testid": "pagination-list"
                         }
                     },
                     "token": "",
                     "chat_id": "",
-                    "path_data": "data/laptops.csv"
+                    "subscribers": {},
+                    "path_data": "data/laptops.csv",
+                    "path_hot_deals": "data/hot_deals.csv",
+                    "storage_backend": "parquet",
+                    "path_db": "data/laptops.db",
+                    "path_history": "data/history",
+                    "history_window_days": 30,
+                    "history_retention_days": 180,
+                    "path_market_stats": "data/market_stats.json",
+                    "path_flag_journal": "data/flags.jsonl",
+                    "flag_flush_delay": 2.0,
+                    "path_photo_cache": "data/photo_ids.json",
+                    "photo_cache_flush_delay": 5.0,
+                    "card_cache_size": 64,
+                    "notify_rate": 30.0,
+                    "notify_chat_interval": 1.0,
+                    "notify_concurrency": 8,
+                    "notify_max_retries": 3,
+                    "notify_shutdown_timeout": 10,
+                    "path_model_schedule": "data/model_schedule.json",
+                    "scan_requests_per_hour": None,
+                    "scan_min_interval": 10,
+                    "scan_max_interval": 360,
+                    "http_pool_size": 10,
+                    "crawl_concurrency": 12,
+                    "crawl_per_host": 6,
+                    "rate_limit": 1.0,
+                    "rate_limit_min": 0.2,
+                    "rate_limit_max": 5.0,
+                    "max_retries": 3,
+                    "target_latency": 2.0,
+                    "path_detail_cache": "data/details_cache.json",
+                    "detail_cache_ttl_hours": 72,
+                    "path_crawl_state": "data/crawl_state.json",
+                    "seen_ids_max_age_days": 30,
+                    "incremental_stop_pages": 2,
+                    "full_crawl_interval_hours": 24,
+                    "page_fanout": 5,
+                    "html_parser": "selectolax",
+                    "spam_check_description": False
                 }
             return output
         
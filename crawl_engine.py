@@ -0,0 +1,192 @@
+import asyncio
+import random
+import time
+import logging
+import aiohttp
+from urllib.parse import urlsplit
+from http_client import HostStats, get_accept_encoding
+from rate_limiter import (AdaptiveRateLimiter, AdaptiveConcurrency, RETRY_STATUSES,
+                          THROTTLE_STATUSES, backoff_delay, parse_retry_after)
+
+
+class CrawlEngine:
+
+    """
+    Асинхронний рушій завантаження сторінок на aiohttp.
+
+    Працює в тому ж event loop, що й бот. Має один глобальний ліміт
+    одночасних запитів та окремий ліміт на кожен хост, тому паралелізм
+    залежить від налаштувань, а не від кількості моделей у config.json.
+
+    Темп запитів задає спільний AdaptiveRateLimiter, а фактична кількість
+    одночасних запитів підлаштовується AdaptiveConcurrency в межах concurrency.
+
+    Використання:
+        async with CrawlEngine(concurrency=12, per_host=6) as engine:
+            html, url = await engine.fetch(link, headers)
+    """
+
+    def __init__(self, concurrency: int = 12, per_host: int = 6, pool_size: int = 10,
+                 timeout: int = 10, stats: HostStats = None, limiter: AdaptiveRateLimiter = None,
+                 max_retries: int = 3, target_latency: float = 2.0):
+        self.concurrency = max(1, int(concurrency))
+        self.per_host = max(1, int(per_host))
+        self.pool_size = max(self.per_host, int(pool_size))
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+        self.stats = stats if stats is not None else HostStats()
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter()
+        self.concurrency_control = AdaptiveConcurrency(
+            initial=min(self.per_host, self.concurrency),
+            maximum=self.concurrency,
+            target_latency=target_latency
+        )
+
+        self._session = None
+        self._slots = None
+        self._in_flight = 0
+        self._host_limits = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        if self._session is not None:
+            return
+
+        connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Accept-Encoding": get_accept_encoding()}
+        )
+        self._slots = asyncio.Condition()
+        self._in_flight = 0
+        self._host_limits = {}
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = asyncio.Semaphore(self.per_host)
+            self._host_limits[host] = limit
+        return limit
+
+    async def _acquire_slot(self):
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._in_flight < self.concurrency_control.limit)
+            self._in_flight += 1
+
+    async def _release_slot(self):
+        async with self._slots:
+            self._in_flight -= 1
+            self._slots.notify_all()
+
+    async def fetch(self, url: str, headers: list) -> tuple[str, str]:
+
+        """
+        Завантажує сторінку через спільну сесію. Повторює запит з
+        експоненційною затримкою при 429/403/5xx та мережевих помилках.
+
+        Args:
+            url (str): Посилання на сторінку.
+            headers (list): Список User-Agent заголовків.
+
+        Returns:
+            tuple[str, str]: Повертає (html_text, actual_url).
+                             Якщо помилка - повертає (None, None).
+        """
+
+        if self._session is None:
+            await self.start()
+
+        for attempt in range(self.max_retries + 1):
+            result, retry, retry_after = await self._attempt(url, headers)
+
+            if not retry:
+                return result
+
+            if attempt < self.max_retries:
+                delay = max(retry_after or 0, backoff_delay(attempt))
+                logging.info(f"Повторна спроба {attempt + 1}/{self.max_retries} для {url} через {delay:.1f} сек.")
+                await asyncio.sleep(delay)
+
+        logging.warning(f"Не вдалося завантажити {url} після {self.max_retries + 1} спроб.")
+        return None, None
+
+    async def _attempt(self, url: str, headers: list) -> tuple[tuple, bool, float]:
+
+        """
+        Одна спроба запиту.
+
+        Returns:
+            tuple: ((html_text, actual_url), чи варто повторити, Retry-After у секундах).
+        """
+
+        host = urlsplit(url).netloc
+
+        await self._acquire_slot()
+        try:
+            async with self._host_limit(host):
+                await asyncio.sleep(self.limiter.reserve(url))
+
+                header = {'User-Agents': random.choice(headers)}
+                started = time.monotonic()
+
+                async with self._session.get(url, headers=header) as response:
+                    body = await response.read()
+                    latency = time.monotonic() - started
+
+                    wire_bytes = int(response.headers.get("Content-Length", len(body)) or 0)
+                    self.stats.record(url, wire_bytes, len(body), response.status)
+
+                    if response.status in THROTTLE_STATUSES:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        self.limiter.on_throttle(url, retry_after)
+                        self.concurrency_control.record(latency, ok=False)
+
+                        if response.status == 403:
+                            logging.warning(f"Доступ заборонено (403) для {url}. Можливо, IP заблоковано.")
+                        else:
+                            logging.warning(f"Занадто багато запитів (429) для {url}. Сповільнюємось.")
+                        return (None, None), True, retry_after
+
+                    if response.status in RETRY_STATUSES:
+                        self.concurrency_control.record(latency, ok=False)
+                        logging.warning(f"Сервер повернув {response.status} для {url}.")
+                        return (None, None), True, parse_retry_after(response.headers.get("Retry-After"))
+
+                    response.raise_for_status()
+
+                    self.limiter.on_success(url)
+                    self.concurrency_control.record(latency, ok=True)
+
+                    text = body.decode(response.get_encoding(), errors="replace")
+                    return (text, str(response.url)), False, None
+
+        except aiohttp.ClientResponseError as e:
+            logging.error(f"HTTP помилка для {url}: {e}")
+            return (None, None), False, None
+        except aiohttp.ClientConnectionError:
+            self.stats.record(url, 0, 0)
+            self.concurrency_control.record(self.timeout, ok=False)
+            logging.error(f"Помилка з'єднання з мережею при спробі відкрити {url}")
+            return (None, None), True, None
+        except asyncio.TimeoutError:
+            self.stats.record(url, 0, 0)
+            self.concurrency_control.record(self.timeout, ok=False)
+            logging.error(f"Таймаут ({self.timeout} сек) при завантаженні {url}")
+            return (None, None), True, None
+        except Exception as e:
+            logging.error(f"Непередбачена помилка: {e}", exc_info=True)
+            return (None, None), False, None
+        finally:
+            await self._release_slot()
@@ -0,0 +1,111 @@
+import json
+import os
+import time
+import logging
+from pathlib import Path
+
+
+class DetailCache:
+
+    """
+    Постійний кеш результатів fetch_and_parse_advert, ключ — ID оголошення.
+
+    Разом із деталями зберігає ціну та заголовок з лістингу на момент
+    завантаження, тож сторінку оголошення треба качати повторно лише для
+    нових ID, для змінених ціни/заголовка або коли запис застарів (ttl_hours).
+
+    Категорія залежить від поточного списку моделей, тому в кеші не
+    зберігається: скрапер визначає її заново для всіх рядків кожного циклу.
+    """
+
+    #поля деталей, які не кешуються
+    VOLATILE_FIELDS = ("category",)
+
+    def __init__(self, path: str, ttl_hours: float = None, max_age_days: float = 30):
+        self.path = Path(path)
+        self.ttl = ttl_hours * 3600 if ttl_hours else None
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.entries = self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, ad_id: str) -> bool:
+        return str(ad_id) in self.entries
+
+    def load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати кеш деталей {self.path}: {e}")
+            return {}
+
+    def save(self):
+
+        """
+        Атомарно записує кеш на диск та видаляє записи, яких не було
+        в лістингу довше за max_age_days.
+        """
+
+        try:
+            if self.max_age:
+                border = time.time() - self.max_age
+                self.entries = {k: v for k, v in self.entries.items() if v.get('last_seen', 0) >= border}
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Не вдалося зберегти кеш деталей {self.path}: {e}")
+
+    def needs_refresh(self, ad_id: str, price, title: str) -> bool:
+
+        """
+        Перевіряє, чи треба заново завантажувати сторінку оголошення.
+
+        Args:
+            ad_id (str): ID оголошення.
+            price: Ціна з лістингу.
+            title (str): Заголовок з лістингу.
+
+        Returns:
+            bool: True, якщо оголошення нове, змінилось або запис застарів.
+        """
+
+        entry = self.entries.get(str(ad_id))
+        if entry is None:
+            return True
+
+        entry['last_seen'] = time.time()
+
+        if str(entry.get('price')) != str(price) or entry.get('title') != title:
+            return True
+
+        if self.ttl and time.time() - entry.get('fetched_at', 0) > self.ttl:
+            return True
+
+        return False
+
+    def get(self, ad_id: str) -> dict:
+        entry = self.entries.get(str(ad_id))
+        if not entry:
+            return None
+        #записи старого формату ще можуть містити категорію
+        return {key: value for key, value in entry['details'].items() if key not in self.VOLATILE_FIELDS}
+
+    def put(self, ad_id: str, details: dict, price, title: str):
+        now = time.time()
+        self.entries[str(ad_id)] = {
+            'details': {key: value for key, value in details.items() if key not in self.VOLATILE_FIELDS},
+            'price': str(price),
+            'title': title,
+            'fetched_at': now,
+            'last_seen': now
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+
+
+class FlagJournal:
+
+    """
+    Журнал позначок користувача (spam, is_new, ...) для оголошень, що лише доповнюється.
+
+    Кожна зміна — це рядок JSON {id, flag, value, ts}, доданий у буфер за O(1).
+    Буфер скидається на диск у фоні після паузи flush_delay (debounce), а коли
+    в файлі накопичується compact_every рядків, журнал переписується лише з
+    останніми значеннями. При завантаженні журнал накладається поверх
+    hot_deals, тож позначки переживають перезапуск і повторний find_hot_deals.
+    """
+
+    def __init__(self, path: str, flush_delay: float = 2.0, compact_every: int = 1000, max_age_days: float = 30):
+        self.path = Path(path)
+        self.flush_delay = flush_delay
+        self.compact_every = compact_every
+        self.max_age = max_age_days * 86400 if max_age_days else None
+
+        self.flags = {}
+        self._buffer = []
+        self._lines = 0
+        self._timer = None
+        self._lock = threading.Lock()
+
+        self.replay()
+
+    def replay(self):
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        #обірваний останній рядок після аварійного завершення
+                        continue
+                    self._apply(record)
+                    self._lines += 1
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати журнал позначок {self.path}: {e}")
+
+    def _apply(self, record: dict):
+        entry = self.flags.setdefault(str(record['id']), {})
+        entry[record['flag']] = record['value']
+        entry['ts'] = record.get('ts', 0)
+
+    def set(self, ad_id: str, flag: str, value):
+
+        """
+        Запам'ятовує позначку одразу в пам'яті та планує запис на диск.
+        """
+
+        record = {'id': str(ad_id), 'flag': flag, 'value': value, 'ts': time.time()}
+
+        with self._lock:
+            self._apply(record)
+            self._buffer.append(json.dumps(record, ensure_ascii=False))
+
+        self._schedule_flush()
+
+    def get(self, ad_id: str, flag: str, default=None):
+        return self.flags.get(str(ad_id), {}).get(flag, default)
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(self.flush_delay, lambda: loop.create_task(asyncio.to_thread(self.flush)))
+
+    def flush(self):
+
+        """
+        Дописує буфер у файл; при потребі стискає журнал.
+        """
+
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+                self._lines += len(lines)
+            except Exception as e:
+                logging.error(f"Не вдалося записати журнал позначок {self.path}: {e}")
+                self._buffer = lines + self._buffer
+                return
+
+            #стискаємо, коли журнал суттєво більший за кількість актуальних позначок
+            if self._lines >= self.compact_every and self._lines >= 2 * len(self.flags):
+                self._compact()
+
+    def _compact(self):
+        if self.max_age:
+            border = time.time() - self.max_age
+            self.flags = {ad_id: entry for ad_id, entry in self.flags.items() if entry.get('ts', 0) >= border}
+
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        lines = [
+            json.dumps({'id': ad_id, 'flag': flag, 'value': value, 'ts': entry.get('ts', 0)}, ensure_ascii=False)
+            for ad_id, entry in self.flags.items()
+            for flag, value in entry.items() if flag != 'ts'
+        ]
+
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write("".join(line + "\n" for line in lines))
+            os.replace(tmp_path, self.path)
+            self._lines = len(lines)
+        except Exception as e:
+            logging.error(f"Не вдалося стиснути журнал позначок {self.path}: {e}")
+
+    def overlay(self, df):
+
+        """
+        Накладає збережені позначки на таблицю (колонка id + колонки позначок).
+        """
+
+        if df.empty or 'id' not in df.columns or not self.flags:
+            return df
+
+        ids = df['id'].astype(str)
+
+        for flag in {flag for entry in self.flags.values() for flag in entry if flag != 'ts'}:
+            if flag not in df.columns:
+                continue
+
+            values = {ad_id: entry[flag] for ad_id, entry in self.flags.items() if flag in entry}
+            mask = ids.isin(values.keys())
+            if not mask.any():
+                continue
+
+            df.loc[mask, flag] = ids[mask].map(values)
+
+        return df
@@ -0,0 +1,181 @@
+import os
+import shutil
+import logging
+import pandas as pd
+from datetime import date, timedelta
+from pathlib import Path
+from storage import PARQUET_AVAILABLE, ANALYSIS_COLUMNS, apply_schema
+
+
+class HistoryStore:
+
+    """
+    Історія лістингу, що лише доповнюється: одна партиція на дату сканування
+    (root/date=YYYY-MM-DD/part.parquet), у межах партиції — один рядок на id.
+
+    Зберігаються лише колонки для ринкової статистики (ANALYSIS_COLUMNS),
+    тож навіть місяці історії займають небагато місця, а партиції, старші
+    за retention_days, видаляються.
+
+    Прочитані та записані партиції тримаються в пам'яті, поки файл на диску
+    не зміниться, тож повторні цикли аналізу не перечитують історію.
+    """
+
+    PREFIX = "date="
+
+    def __init__(self, root: str, retention_days: int = 180):
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self.suffix = ".parquet" if PARQUET_AVAILABLE else ".csv"
+        self._cache = {}
+
+    def _partition(self, day: date) -> Path:
+        return self.root / f"{self.PREFIX}{day.isoformat()}" / f"part{self.suffix}"
+
+    def partitions(self) -> dict:
+
+        """
+        Returns:
+            dict: Дата -> шлях до файлу партиції, відсортовано за датою.
+        """
+
+        if not self.root.exists():
+            return {}
+
+        found = {}
+        for folder in self.root.iterdir():
+            if not folder.name.startswith(self.PREFIX):
+                continue
+            try:
+                day = date.fromisoformat(folder.name[len(self.PREFIX):])
+            except ValueError:
+                continue
+
+            path = folder / f"part{self.suffix}"
+            if path.exists():
+                found[day] = path
+
+        return dict(sorted(found.items()))
+
+    def _read_file(self, path: Path) -> pd.DataFrame:
+        if self.suffix == ".parquet":
+            return pd.read_parquet(path)
+        return pd.read_csv(path)
+
+    def _load(self, day: date, path: Path) -> pd.DataFrame:
+        mtime = path.stat().st_mtime_ns
+        cached = self._cache.get(day)
+
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, apply_schema(self._read_file(path)))
+            self._cache[day] = cached
+
+        return cached[1]
+
+    def _write_file(self, path: Path, df: pd.DataFrame):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+
+        if self.suffix == ".parquet":
+            df.to_parquet(tmp_path, index=False, compression="zstd")
+        else:
+            df.to_csv(tmp_path, index=False)
+
+        os.replace(tmp_path, path)
+
+    def append(self, listings: pd.DataFrame, day: date = None):
+
+        """
+        Додає знімок лістингу в партицію дня day (за замовчуванням — сьогодні).
+        Повторні сканування того ж дня перезаписують рядки з тими ж id.
+        """
+
+        if listings.empty or 'id' not in listings.columns:
+            return
+
+        day = day or date.today()
+        path = self._partition(day)
+
+        try:
+            snapshot = listings[[col for col in ANALYSIS_COLUMNS if col in listings.columns]].copy()
+            snapshot = apply_schema(snapshot)
+
+            if path.exists():
+                snapshot = pd.concat([snapshot, self._load(day, path)], ignore_index=True)
+
+            snapshot = apply_schema(snapshot.drop_duplicates(subset=['id'], keep='first').reset_index(drop=True))
+            self._write_file(path, snapshot)
+            self._cache[day] = (path.stat().st_mtime_ns, snapshot)
+
+            self.prune(day)
+
+        except Exception as e:
+            logging.error(f"Не вдалося записати історію за {day}: {e}")
+
+    def prune(self, today: date = None):
+        if not self.retention_days:
+            return
+
+        border = (today or date.today()) - timedelta(days=self.retention_days)
+        for day, path in self.partitions().items():
+            if day < border:
+                shutil.rmtree(path.parent, ignore_errors=True)
+                self._cache.pop(day, None)
+
+    def read_window(self, days: int, columns: list = None, today: date = None) -> pd.DataFrame:
+
+        """
+        Читає лише партиції за останні days днів (включно з сьогоднішньою).
+
+        Returns:
+            pd.DataFrame: Рядки з колонкою scraped_on; одне оголошення може зустрічатися
+            в кількох партиціях.
+        """
+
+        border = (today or date.today()) - timedelta(days=max(days - 1, 0))
+        frames = []
+
+        for day, path in self.partitions().items():
+            if day < border:
+                continue
+            try:
+                partition = self._load(day, path)
+                if columns is not None:
+                    partition = partition[[col for col in columns if col in partition.columns]]
+                frames.append(partition.assign(scraped_on=day.isoformat()))
+            except Exception as e:
+                logging.error(f"Не вдалося прочитати партицію {path}: {e}")
+
+        if not frames:
+            return pd.DataFrame()
+
+        return apply_schema(pd.concat(frames, ignore_index=True))
+
+    def latest_prices(self, days: int, today: date = None) -> pd.DataFrame:
+
+        """
+        Останнє відоме спостереження кожного оголошення у вікні days днів,
+        щоб довго виставлене оголошення не рахувалося в медіані багато разів.
+        """
+
+        history = self.read_window(days, ANALYSIS_COLUMNS, today)
+        if history.empty:
+            return history
+
+        history = history.sort_values('scraped_on', ascending=False, kind='stable')
+        return history.drop_duplicates(subset=['id'], keep='first').reset_index(drop=True)
+
+
+#одне сховище на каталог, щоб кеш партицій жив між циклами
+_stores = {}
+
+
+def get_history(config) -> HistoryStore:
+    root = config.data.get('path_history', 'data/history')
+
+    store = _stores.get(root)
+    if store is None:
+        store = _stores[root] = HistoryStore(root)
+
+    store.retention_days = config.data.get('history_retention_days', 180)
+    return store
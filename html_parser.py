@@ -0,0 +1,151 @@
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+#теги, текст яких BeautifulSoup не включає в get_text()
+_SKIP_TEXT_PARENTS = {"script", "style", "template"}
+
+_backend = "html.parser"
+
+
+def configure(backend: str) -> str:
+
+    """
+    Обирає бекенд парсингу HTML. Якщо потрібної бібліотеки немає,
+    повертається до стандартного 'html.parser'.
+
+    Args:
+        backend (str): 'html.parser', 'lxml' або 'selectolax'.
+
+    Returns:
+        str: Фактично обраний бекенд.
+    """
+
+    global _backend
+
+    if backend not in BACKENDS:
+        logging.warning(f"Невідомий парсер '{backend}', використовуємо html.parser.")
+        backend = "html.parser"
+    elif backend == "selectolax" and LexborHTMLParser is None:
+        logging.warning("selectolax не встановлено, використовуємо html.parser.")
+        backend = "html.parser"
+    elif backend == "lxml" and not LXML_AVAILABLE:
+        logging.warning("lxml не встановлено, використовуємо html.parser.")
+        backend = "html.parser"
+
+    _backend = backend
+    return _backend
+
+
+def get_backend() -> str:
+    return _backend
+
+
+class SelectolaxNode:
+
+    """
+    Мінімальна обгортка над вузлом selectolax з тим самим API, що
+    використовує скрапер у BeautifulSoup: find, find_all, get_text, get.
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    @staticmethod
+    def _css(name: str = None, attrs: dict = None) -> str:
+        css = name or "*"
+        for key, value in (attrs or {}).items():
+            css += f'[{key}="{value}"]'
+        return css
+
+    def find_all(self, name: str = None, attrs: dict = None) -> list:
+        #як і в BeautifulSoup, шукаємо лише серед нащадків, без самого вузла
+        return [
+            SelectolaxNode(node) for node in self.node.css(self._css(name, attrs))
+            if node.mem_id != self.node.mem_id
+        ]
+
+    def find(self, name: str = None, attrs: dict = None):
+        for node in self.node.css(self._css(name, attrs)):
+            if node.mem_id != self.node.mem_id:
+                return SelectolaxNode(node)
+        return None
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        parts = []
+
+        for node in self.node.traverse(include_text=True):
+            if node.tag != "-text" or (node.parent is not None and node.parent.tag in _SKIP_TEXT_PARENTS):
+                continue
+
+            text = node.text_content or ""
+            if strip:
+                text = text.strip()
+                if not text:
+                    continue
+            parts.append(text)
+
+        return separator.join(parts)
+
+    def get(self, key: str, default=None):
+        value = self.node.attributes.get(key)
+        return default if value is None else value
+
+
+def _strainer(selectors: dict, keys: list) -> SoupStrainer:
+
+    """
+    Будує SoupStrainer, який залишає лише піддерева з потрібними data-testid.
+    """
+
+    values = {}
+    for key in keys:
+        for attr, value in (selectors.get(key) or {}).items():
+            values.setdefault(attr, set()).add(value)
+
+    if len(values) != 1:
+        return None
+
+    attr, wanted = next(iter(values.items()))
+    return SoupStrainer(attrs={attr: list(wanted)})
+
+
+def parse_html(html: str, selectors: dict = None, keys: list = None):
+
+    """
+    Парсить HTML обраним бекендом.
+
+    Для BeautifulSoup-бекендів, якщо задано keys, будується лише частина
+    дерева — піддерева елементів, описаних селекторами selectors[key].
+
+    Args:
+        html (str): HTML сторінки.
+        selectors (dict): Селектори з конфігу.
+        keys (list): Ключі селекторів, піддерева яких потрібні.
+
+    Returns:
+        Об'єкт з методами find/find_all/get_text/get (BeautifulSoup або SelectolaxNode).
+    """
+
+    if _backend == "selectolax":
+        root = LexborHTMLParser(html).root
+        if root is not None:
+            return SelectolaxNode(root)
+
+    strainer = _strainer(selectors or {}, keys) if keys else None
+    features = "lxml" if _backend == "lxml" else "html.parser"
+
+    return BeautifulSoup(html, features, parse_only=strainer)
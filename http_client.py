@@ -0,0 +1,60 @@
+import threading
+import logging
+from urllib.parse import urlsplit
+
+
+def get_accept_encoding() -> str:
+
+    """
+    Формує заголовок Accept-Encoding. Brotli просимо лише тоді,
+    коли aiohttp зможе його розпакувати (встановлено brotli або brotlicffi).
+    """
+
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        pass
+
+    try:
+        import brotlicffi  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+class HostStats:
+
+    """
+    Потокобезпечний лічильник запитів та трафіку для кожного хоста.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.data = {}
+
+    def record(self, url: str, wire_bytes: int, body_bytes: int, status: int = None):
+        host = urlsplit(url).netloc or "unknown"
+
+        with self._lock:
+            stats = self.data.setdefault(host, {"requests": 0, "errors": 0, "wire_bytes": 0, "body_bytes": 0})
+            stats["requests"] += 1
+            stats["wire_bytes"] += wire_bytes
+            stats["body_bytes"] += body_bytes
+            if status is None or status >= 400:
+                stats["errors"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {host: dict(stats) for host, stats in self.data.items()}
+
+    def reset(self):
+        with self._lock:
+            self.data.clear()
+
+    def log(self):
+        for host, stats in self.snapshot().items():
+            logging.info(
+                f"HTTP {host}: запитів {stats['requests']} (помилок {stats['errors']}), "
+                f"трафік {stats['wire_bytes'] / 1024:.0f} КБ, після розпакування {stats['body_bytes'] / 1024:.0f} КБ"
+            )
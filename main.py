@@ -1,60 +1,82 @@
 import asyncio
+import time
+import importlib
 import logging
 import sys
 import os
 from aiogram import Bot
 from tg_bot import dp, notify_users_new_deals
-from analysis_engine import find_hot_deals
-from scraper import run_scraper
+from notifier import flush_notifier
+from card_cache import get_photo_cache, get_card_cache
+from persistence import PersistenceSink
+from scan_coordinator import ScanCoordinator
+from model_scheduler import get_model_scheduler
 from config_manager import ConfigManager
 from LaptopBase import LaptopBase
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-    handlers=[
-        logging.FileHandler("bot.log", encoding='utf-8'), 
-        logging.StreamHandler(sys.stdout)                 
-    ]
-)
-
-async def scheduled_scraping(laptops: LaptopBase, config: ConfigManager, bot: Bot):
-    """Фонова задача для регулярного сканування."""
+def setup_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
+        handlers=[
+            logging.FileHandler("bot.log", encoding='utf-8'), 
+            logging.StreamHandler(sys.stdout)                 
+        ]
+    )
+
+async def scheduled_scraping(laptops: LaptopBase, config: ConfigManager, bot: Bot, scans: ScanCoordinator):
+    """
+    Фонова задача для регулярного сканування. Які моделі і коли сканувати,
+    вирішує ModelScheduler: активні моделі частіше, тихі рідше, в межах
+    бюджету запитів. Конвеєр запускається через ScanCoordinator, тож якщо
+    в цей момент уже йде ручне /scan, планувальник приєднується до нього,
+    а відлік до наступних запусків іде від завершення останнього сканування.
+    """
     logging.info("Планувальник завдань запущено.")
 
+    #скрапер, pandas та решта важких залежностей завантажуються у фоновому потоці
+    #вже після старту бота, не блокуючи обробку повідомлень
+    await asyncio.to_thread(importlib.import_module, "pipeline")
+    #у потоці лише читаємо таблицю, а підміняємо df уже в циклі подій
+    laptops.df = await asyncio.to_thread(laptops.read)
+
+    scheduler = get_model_scheduler(config)
+
     while True:
         try:
-            interval = config.data.get('check_interval', 30)
-            
-            logging.info("Початок автоматичного сканування...")
-            
-            success = await asyncio.to_thread(run_scraper)
+            scheduler.sync(config.data.get('models', []))
+            due = scheduler.due()
 
-            if success:
-                logging.info("Скрапінг успішний. Аналізуємо дані...")
-                await asyncio.to_thread(find_hot_deals)
+            if not due:
+                #прокидаємось щонайменше раз на хвилину, щоб підхопити зміни моделей у /settings
+                next_due = scheduler.next_due()
+                delay = min(60, next_due - time.time()) if next_due is not None else 60
+                await asyncio.sleep(max(1, delay))
+                continue
 
-                laptops.update()
-                
-                if not laptops.df.empty and 'is_new' in laptops.df.columns:
-                    laptops.df = laptops.df.sort_values(by='is_new', ascending=False)
-                    laptops.df.reset_index(drop=True, inplace=True)
-                    logging.info("Дані відсортовані: нові оголошення вгорі.")
+            logging.info(f"Початок автоматичного сканування моделей: {', '.join(due)}...")
+            
+            success, progress = await scans.run_with_progress(due)
 
-                logging.info(f"Серед них нових: {len(laptops.df[laptops.df['is_new']==True])}!")
+            if not success:
+                logging.warning("Скрапінг завершився невдачею або не знайшов оголошень.")
+            elif progress.new_deal_ids:
+                logging.info(f"Серед них нових: {len(progress.new_deal_ids)}!")
                 
-                await notify_users_new_deals(bot, config, laptops)
+                await notify_users_new_deals(bot, config, laptops, progress.new_deal_ids)
             else:
-                logging.warning("Скрапінг завершився невдачею або не знайшов оголошень.")
+                #сканування частини моделей часто не додає нових пропозицій — не сповіщаємо
+                logging.info("Нових гарячих пропозицій не додано, сповіщення не надсилаються.")
 
         except Exception as e:
             logging.error(f"Критична помилка в планувальнику: {e}", exc_info=True)
             await asyncio.sleep(60) 
             continue
 
-        logging.info(f" Спимо {interval} хвилин до наступного пошуку.")
-        await asyncio.sleep(interval * 60)
+        next_due = scheduler.next_due()
+        if next_due is not None:
+            logging.info(f" Наступне сканування через {max(0, next_due - time.time()) / 60:.0f} хв.")
 
 
 
@@ -70,25 +92,38 @@ async def main():
             return
 
         bot = Bot(token=token)
-        laptops = LaptopBase("data/hot_deals.csv")
+        laptops = LaptopBase(config=config)
+        sink = PersistenceSink()
+        photos = get_photo_cache(config)
+        get_card_cache(config)
+        scans = ScanCoordinator(laptops, config, sink)
         
-        app_data = {"laptops": laptops, "config": config}
+        app_data = {"laptops": laptops, "config": config, "sink": sink, "scans": scans}
 
-        asyncio.create_task(scheduled_scraping(laptops, config, bot))
+        asyncio.create_task(scheduled_scraping(laptops, config, bot, scans))
 
         logging.info(f"Система запущена! Бот { (await bot.get_me()).username } чекає на команди...")
 
         await bot.delete_webhook(drop_pending_updates=True)
-        await dp.start_polling(bot, **app_data)
+        #сесію бота закриваємо самі, вже після відправки черги сповіщень
+        await dp.start_polling(bot, close_bot_session=False, **app_data)
 
     except Exception as e:
         logging.critical(f"Фатальна помилка при старті: {e}", exc_info=True)
     finally:
+        if 'sink' in locals():
+            await sink.flush()
+        if 'laptops' in locals():
+            laptops.flush()
+        if 'photos' in locals():
+            photos.flush()
         if 'bot' in locals():
+            await flush_notifier(config.data.get('notify_shutdown_timeout', 10))
             await bot.session.close()
         logging.info("Бот зупинений.")
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
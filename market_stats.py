@@ -0,0 +1,281 @@
+import json
+import os
+import time
+import logging
+import numpy as np
+import pandas as pd
+from bisect import bisect_left, insort
+from pathlib import Path
+
+
+GROUP_COLS = ['category', 'ram', 'disk_v']
+
+
+class MarketStats:
+
+    """
+    Ринкова статистика (медіана та кількість цін) по групах category/ram/disk_v,
+    що зберігається між запусками find_hot_deals.
+
+    Стан — ринковий набір оголошень: для кожного id код його групи, ціна
+    та час, коли його востаннє бачили в лістингу. Оголошення лишається в
+    наборі ще window_days днів після зникнення з OLX, тож набір замінює
+    читання історії за вікно. Кожен цикл порівнює свіжий лістинг зі станом
+    за id, і лише нові та переоцінені оголошення, а також ті, що вийшли за
+    вікно чи стали спамом, оновлюють відсортовані списки цін груп; медіана
+    перераховується тільки для зачеплених груп.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.reset()
+        self.load()
+
+    def reset(self):
+        self.groups_keys = []
+        self.key_codes = {}
+        self.ids = np.array([], dtype=object)
+        self.codes = np.array([], dtype='int64')
+        self.prices = np.array([], dtype='int64')
+        self.seen = np.array([], dtype='float64')
+        self.groups = {}
+        self.stats = {}
+        self._index = None
+
+    @property
+    def empty(self) -> bool:
+        return len(self.ids) == 0
+
+    def _code(self, key: tuple) -> int:
+        code = self.key_codes.get(key)
+        if code is None:
+            code = len(self.groups_keys)
+            self.groups_keys.append(key)
+            self.key_codes[key] = code
+        return code
+
+    def _id_index(self) -> pd.Index:
+        if self._index is None:
+            self._index = pd.Index(self.ids)
+        return self._index
+
+    def _rebuild(self):
+        order = np.lexsort((self.prices, self.codes))
+        codes, prices = self.codes[order], self.prices[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+
+        self.groups = {
+            int(group_codes[0]): group_prices.tolist()
+            for group_codes, group_prices in zip(np.split(codes, bounds), np.split(prices, bounds))
+            if len(group_codes)
+        }
+        self.stats = {code: self._describe(prices) for code, prices in self.groups.items()}
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            #стан без часу спостережень (старий формат) заповнюється заново з історії
+            if 'seen' not in state:
+                return
+
+            self.groups_keys = [tuple(key) for key in state['keys']]
+            self.key_codes = {key: code for code, key in enumerate(self.groups_keys)}
+            self.ids = np.array(state['ids'], dtype=object)
+            self.codes = np.array(state['codes'], dtype='int64')
+            self.prices = np.array(state['prices'], dtype='int64')
+            self.seen = np.array(state['seen'], dtype='float64')
+            self._rebuild()
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати статистику ринку {self.path}: {e}")
+            self.reset()
+
+    def snapshot(self) -> dict:
+        #update не змінює масиви на місці, тож знімок можна писати у фоні
+        return {
+            'keys': list(self.groups_keys),
+            'ids': self.ids,
+            'codes': self.codes,
+            'prices': self.prices,
+            'seen': self.seen
+        }
+
+    def save(self, state: dict = None):
+        state = self.snapshot() if state is None else state
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+
+            state = {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in state.items()}
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Не вдалося зберегти статистику ринку {self.path}: {e}")
+
+    @staticmethod
+    def _describe(prices: list) -> tuple:
+        count = len(prices)
+        middle = count // 2
+        median = prices[middle] if count % 2 else (prices[middle - 1] + prices[middle]) / 2
+        return float(median), count
+
+    def _remove(self, code: int, price: int):
+        prices = self.groups.get(code)
+        if not prices:
+            return
+
+        pos = bisect_left(prices, price)
+        if pos < len(prices) and prices[pos] == price:
+            prices.pop(pos)
+
+    def update(self, listings: pd.DataFrame, excluded=(), window_days: float = 30, now: float = None) -> set:
+
+        """
+        Вносить у ринковий набір свіжий лістинг (id, category, ram, disk_v, price).
+
+        Args:
+            listings (pd.DataFrame): Оголошення, що враховуються в статистиці.
+                Рядки з порожньою ціною чи групою вважаються виключеними.
+            excluded: ID з лістингу, які не можна враховувати (спам, невідома модель).
+            window_days (float): Скільки днів зникле оголошення лишається в наборі;
+                0 — статистика лише за поточним лістингом.
+            now (float): Час сканування (timestamp), або seen кожного рядка
+                в колонці 'seen' при заповненні з історії.
+
+        Returns:
+            set: Коди груп, статистика яких змінилась.
+        """
+
+        now = time.time() if now is None else now
+
+        complete = listings[['id', 'price'] + GROUP_COLS].notna().all(axis=1).to_numpy()
+        valid = listings[complete].drop_duplicates(subset=['id'], keep='first')
+        excluded = set(map(str, excluded)) | set(listings.loc[~complete, 'id'].dropna().astype(str))
+
+        ids = valid['id'].astype(str).to_numpy(dtype=object)
+        categories = valid['category'].astype(str).to_numpy(dtype=object)
+        rams = valid['ram'].to_numpy(dtype='int64')
+        disks = valid['disk_v'].to_numpy(dtype='int64')
+        prices = valid['price'].to_numpy(dtype='int64')
+        seen = valid['seen'].to_numpy(dtype='float64') if 'seen' in valid.columns else np.full(len(ids), now)
+
+        #позиція кожного id у стані (-1 — нове оголошення)
+        previous = self._id_index().get_indexer(ids) if len(self.ids) else np.full(len(ids), -1)
+        known = previous >= 0
+        positions = previous[known]
+
+        #для відомих id групу порівнюємо через частини ключа її коду, без groupby
+        changed = ~known
+        if len(positions):
+            key_parts = list(zip(*self.groups_keys))
+            old_codes = self.codes[positions]
+            changed[known] = (
+                (self.prices[positions] != prices[known])
+                | (np.array(key_parts[0], dtype=object)[old_codes] != categories[known])
+                | (np.array(key_parts[1], dtype='int64')[old_codes] != rams[known])
+                | (np.array(key_parts[2], dtype='int64')[old_codes] != disks[known])
+            )
+
+        codes = self.codes.copy()
+        self.prices = self.prices.copy()
+        self.seen = self.seen.copy()
+        touched = set()
+
+        #переоцінені або перенесені в іншу групу оголошення
+        moved = changed & known
+        for pos, category, ram, disk, price in zip(previous[moved].tolist(), categories[moved].tolist(),
+                                                   rams[moved].tolist(), disks[moved].tolist(), prices[moved].tolist()):
+            self._remove(int(codes[pos]), int(self.prices[pos]))
+            touched.add(int(codes[pos]))
+
+            code = self._code((category, ram, disk))
+            insort(self.groups.setdefault(code, []), price)
+            touched.add(code)
+            codes[pos], self.prices[pos] = code, price
+
+        self.seen[positions] = np.maximum(self.seen[positions], seen[known])
+
+        #нові оголошення дописуються в кінець стану
+        added = ~known
+        if added.any():
+            new_codes = []
+            for category, ram, disk, price in zip(categories[added].tolist(), rams[added].tolist(),
+                                                  disks[added].tolist(), prices[added].tolist()):
+                code = self._code((category, ram, disk))
+                insort(self.groups.setdefault(code, []), price)
+                touched.add(code)
+                new_codes.append(code)
+
+            self.ids = np.concatenate([self.ids, ids[added]])
+            codes = np.concatenate([codes, np.array(new_codes, dtype='int64')])
+            self.prices = np.concatenate([self.prices, prices[added]])
+            self.seen = np.concatenate([self.seen, seen[added]])
+            self._index = None
+
+        self.codes = codes
+        excluded -= set(ids)
+
+        #виключені з лістингу та ті, що не з'являлись довше за вікно
+        expired = self.seen < now - (window_days or 0) * 86400
+        if excluded:
+            expired |= self._id_index().isin(list(excluded))
+        if expired.any():
+            for code, price in zip(self.codes[expired].tolist(), self.prices[expired].tolist()):
+                self._remove(code, price)
+                touched.add(code)
+
+            kept = ~expired
+            self.ids, self.codes = self.ids[kept], self.codes[kept]
+            self.prices, self.seen = self.prices[kept], self.seen[kept]
+            self._index = None
+
+        for code in touched:
+            group_prices = self.groups.get(code)
+            if group_prices:
+                self.stats[code] = self._describe(group_prices)
+            else:
+                self.groups.pop(code, None)
+                self.stats.pop(code, None)
+
+        return touched
+
+    def lookup(self, ids) -> tuple:
+
+        """
+        Медіана та кількість цін групи для кожного id.
+
+        Returns:
+            tuple: (median, count) — масиви float64; для id поза набором NaN і 0.
+        """
+
+        median = np.full(len(self.groups_keys) + 1, np.nan)
+        count = np.zeros(len(self.groups_keys) + 1)
+        for code, (group_median, group_count) in self.stats.items():
+            median[code], count[code] = group_median, group_count
+
+        positions = self._id_index().get_indexer(pd.Index(ids).astype(str)) if len(self.ids) else np.full(len(ids), -1)
+        #невідомі id посилаються на останній, порожній елемент
+        codes = np.where(positions >= 0, self.codes[positions] if len(self.codes) else -1, len(self.groups_keys))
+        return median[codes], count[codes]
+
+    def frame(self) -> pd.DataFrame:
+
+        """
+        Статистика груп у вигляді DataFrame (category, ram, disk_v, median, count).
+        """
+
+        codes = list(self.stats)
+        keys = [self.groups_keys[code] for code in codes]
+
+        return pd.DataFrame({
+            'category': [key[0] for key in keys],
+            'ram': pd.array([key[1] for key in keys], dtype='Int64'),
+            'disk_v': pd.array([key[2] for key in keys], dtype='Int64'),
+            'median': pd.array([self.stats[code][0] for code in codes], dtype='float64'),
+            'count': pd.array([self.stats[code][1] for code in codes], dtype='Int64')
+        })
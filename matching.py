@@ -0,0 +1,137 @@
+import re
+import logging
+import numpy as np
+from collections import OrderedDict
+from rapidfuzz import process, fuzz
+
+
+#функція пакетної перевірки текстів на спам
+def detect_spam_batch(texts: list, black_list: list, threshold: int = 80, workers: int = -1) -> np.ndarray:
+
+    """
+    Перевіряє всі тексти на спам (fuzz.partial_ratio) проти всього
+    чорного списку одним викликом process.cdist на всіх ядрах.
+
+    Очевидні збіги (слово з чорного списку входить у текст дослівно)
+    відсіюються regex-ом ще до нечіткого порівняння.
+
+    Args:
+        texts (list): Заголовки або описи.
+        black_list (list): Список заборонених слів.
+        threshold (int): Поріг partial_ratio, вище якого текст вважається спамом.
+        workers (int): Кількість потоків rapidfuzz (-1 — всі ядра).
+
+    Returns:
+        np.ndarray: Булева маска, True — спам.
+    """
+
+    texts = list(texts)
+    is_spam = np.zeros(len(texts), dtype=bool)
+    black_list = [word for word in (black_list or []) if word]
+
+    if not texts or not black_list:
+        return is_spam
+
+    try:
+        valid = np.array([isinstance(t, str) and bool(t) for t in texts], dtype=bool)
+
+        pattern = re.compile("|".join(re.escape(word) for word in black_list))
+        exact = np.array([bool(valid[i] and pattern.search(t)) for i, t in enumerate(texts)], dtype=bool)
+        is_spam |= exact
+
+        rest = np.flatnonzero(valid & ~exact)
+        if rest.size:
+            scores = process.cdist(
+                [texts[i] for i in rest],
+                black_list,
+                scorer=fuzz.partial_ratio,
+                score_cutoff=threshold,
+                workers=workers
+            )
+            is_spam[rest] = (scores > threshold).any(axis=1)
+
+    except Exception as e:
+        logging.error(f"Помилка пакетної перевірки на спам: {e}", exc_info=True)
+
+    return is_spam
+
+
+class CategoryMatcher:
+
+    """
+    Пакетна категоризація заголовків за цільовими моделями.
+
+    Заголовки нормалізуються один раз, результат запам'ятовується в LRU-кеші
+    (нормалізований заголовок -> категорія), спільному між циклами сканування.
+    Нові заголовки порівнюються з усіма моделями одним process.cdist на всіх ядрах,
+    тож повторно виставлені оголошення з тим самим заголовком нічого не коштують.
+    """
+
+    TRASH_PATTERN = re.compile(r'[!\?\(\)\[\]@,\.\;\/\\"\']')
+    SPACES_PATTERN = re.compile(r'\s+')
+
+    def __init__(self, maxsize: int = 50000, threshold: int = 90, workers: int = -1):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.workers = workers
+        self.cache = OrderedDict()
+        self._models = None
+
+    @classmethod
+    def normalize(cls, title: str) -> str:
+        if not title or not isinstance(title, str):
+            return ""
+
+        clean_title = cls.TRASH_PATTERN.sub(" ", title)
+        return cls.SPACES_PATTERN.sub(" ", clean_title).strip().lower()
+
+    def categorize(self, titles: list, target: list) -> list[str]:
+
+        """
+        Визначає модель для кожного заголовка (fuzz.token_set_ratio понад threshold).
+
+        Args:
+            titles (list): Заголовки оголошень.
+            target (list): Список шуканих моделей (рядки або списки з однієї моделі).
+
+        Returns:
+            list[str]: Назва моделі або "unKnown" для кожного заголовка.
+        """
+
+        try:
+            models = [m[0] if isinstance(m, list) else m for m in target or []]
+
+            #при зміні списку моделей старі відповіді вже некоректні
+            if models != self._models:
+                self.cache.clear()
+                self._models = models
+
+            normalized = [self.normalize(title) for title in titles]
+
+            if not models:
+                return ["unKnown"] * len(normalized)
+
+            missing = [title for title in dict.fromkeys(normalized) if title and title not in self.cache]
+
+            if missing:
+                scores = process.cdist(missing, models, scorer=fuzz.token_set_ratio, workers=self.workers)
+                best = scores.argmax(axis=1)
+
+                for title, idx, row in zip(missing, best, scores):
+                    self.cache[title] = models[idx] if row[idx] > self.threshold else "unKnown"
+
+            result = []
+            for title in normalized:
+                category = self.cache.get(title, "unKnown")
+                if title in self.cache:
+                    self.cache.move_to_end(title)
+                result.append(category)
+
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+
+            return result
+
+        except Exception as e:
+            logging.error(f"Помилка пакетної категоризації: {e}", exc_info=True)
+            return ["unKnown"] * len(titles)
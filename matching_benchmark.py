@@ -0,0 +1,190 @@
+"""
+Бенчмарк пакетної обробки лістингу: detect_spam_batch (заголовки та
+описи), clean_prices та cleaner на синтетичному лістингу (~100 тис. рядків).
+
+Запуск:
+    python matching_benchmark.py                 # звіт
+    python matching_benchmark.py --rows 20000    # менший лістинг
+    python matching_benchmark.py --strict        # код виходу 1, якщо бюджет перевищено
+
+Для порівняння на вибірці з --sample рядків міряються й поелементні
+версії (rapidfuzz.process.extractOne та re.sub на кожен рядок, а для
+cleaner — копія, drop_duplicates і apply по рядках), якими скрапер
+користувався до пакетної обробки; їхній результат має збігатися
+з пакетним, а час перераховується на весь лістинг.
+"""
+
+import argparse
+import logging
+import random
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+from matching import detect_spam_batch
+from scraper import cleaner, clean_prices
+
+
+ROWS = 100_000
+SAMPLE = 5_000
+
+#бюджети в секундах для ROWS рядків; для іншої кількості масштабуються лінійно
+BUDGETS = {
+    "detect_spam_batch (заголовки)": 2.0,
+    "detect_spam_batch (описи)": 6.0,
+    "clean_prices": 0.5,
+    "cleaner": 3.0,
+}
+
+BLACK_LIST = ["uszkodzony", "na części", "zablokowany", "icloud", "bez dysku", "pęknięta matryca"]
+
+_WORDS = ["macbook", "pro", "air", "m1", "m2", "thinkpad", "t14", "x1", "carbon", "dell", "xps", "legion",
+          "16gb", "32gb", "512", "1tb", "stan", "idealny", "okazja", "gwarancja", "bateria", "ładowarka"]
+
+
+def make_listing(rows: int, seed: int = 0) -> pd.DataFrame:
+
+    """
+    Синтетичний лістинг, схожий на результат target_scrap_OLX + деталі:
+    ~10% дублікатів id, ~3% заголовків і описів зі словами з чорного списку
+    (частина — з одруківками, щоб спрацьовувало нечітке порівняння) і ціни
+    у звичних для OLX форматах.
+    """
+
+    rng = random.Random(seed)
+    titles, descriptions, prices, ids = [], [], [], []
+
+    for _ in range(rows):
+        title = " ".join(rng.sample(_WORDS, 5))
+        description = " ".join(rng.choices(_WORDS, k=40))
+
+        if rng.random() < 0.03:
+            word = rng.choice(BLACK_LIST)
+            if rng.random() < 0.5:
+                pos = rng.randrange(len(word))
+                word = word[:pos] + word[pos + 1:]
+            title = f"{title} {word}"
+            description = f"{description} {word}"
+
+        titles.append(title)
+        descriptions.append(description)
+        ids.append(str(rng.randint(0, int(rows * 0.9))))
+        prices.append(rng.choice([
+            f"{rng.randint(1, 20)} {rng.randint(0, 999):03d} zł",
+            f"{rng.randint(500, 9000)} zł do negocjacji",
+            "Zamienię",
+            None,
+        ]))
+
+    return pd.DataFrame({"id": ids, "offer_title": titles, "description": descriptions, "price": prices})
+
+
+def _reference_spam(texts: list, black_list: list, threshold: int = 80) -> np.ndarray:
+    result = []
+    for text in texts:
+        match = process.extractOne(text, black_list, scorer=fuzz.partial_ratio) if text else None
+        result.append(bool(match and match[1] > threshold))
+    return np.array(result, dtype=bool)
+
+
+def _reference_price(price) -> int:
+    if not price or not isinstance(price, str):
+        return 0
+    digits = re.sub(r"\D", "", price)
+    return int(digits) if digits else 0
+
+
+def _reference_prices(prices: pd.Series) -> pd.Series:
+    return prices.map(_reference_price).astype("int64")
+
+
+def _reference_cleaner(data: pd.DataFrame, black_list: list) -> pd.DataFrame:
+    #cleaner до пакетної обробки: копія, drop_duplicates і apply по рядках
+    clean_data = data.copy()
+    clean_data.drop_duplicates(subset=["id"], keep="first", inplace=True)
+    clean_data.reset_index(inplace=True, drop=True)
+
+    spam = clean_data["offer_title"].apply(lambda text: bool(_reference_spam([text], black_list)[0]))
+    clean_data = clean_data[~spam].reset_index(drop=True)
+
+    clean_data["price"] = clean_data["price"].apply(_reference_price).astype("int64")
+    return clean_data
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def measure(rows: int = ROWS, sample: int = SAMPLE) -> dict:
+
+    """
+    Returns:
+        dict: Назва виміру -> (час пакетної версії, оцінка часу поелементної
+        версії на весь лістинг або None, чи збігся результат на вибірці).
+    """
+
+    listing = make_listing(rows)
+    part = listing.head(sample)
+    scale = rows / max(1, len(part))
+
+    results = {}
+
+    for name, column in [("detect_spam_batch (заголовки)", "offer_title"), ("detect_spam_batch (описи)", "description")]:
+        seconds, _ = _timed(detect_spam_batch, listing[column], BLACK_LIST)
+        ref_seconds, expected = _timed(_reference_spam, list(part[column]), BLACK_LIST)
+        same = np.array_equal(detect_spam_batch(part[column], BLACK_LIST), expected)
+        results[name] = (seconds, ref_seconds * scale, same)
+
+    seconds, _ = _timed(clean_prices, listing["price"])
+    ref_seconds, expected = _timed(_reference_prices, part["price"])
+    results["clean_prices"] = (seconds, ref_seconds * scale, clean_prices(part["price"]).equals(expected))
+
+    seconds, _ = _timed(cleaner, listing, BLACK_LIST)
+    ref_seconds, expected = _timed(_reference_cleaner, part, BLACK_LIST)
+    results["cleaner"] = (seconds, ref_seconds * scale, cleaner(part, BLACK_LIST).equals(expected))
+
+    return results
+
+
+def budget_for(name: str, rows: int) -> float:
+    return BUDGETS[name] * rows / ROWS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=ROWS, help="кількість рядків лістингу")
+    parser.add_argument("--sample", type=int, default=SAMPLE, help="рядків для поелементного порівняння")
+    parser.add_argument("--strict", action="store_true", help="завершитись з кодом 1 при перевищенні бюджету")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    failures = []
+
+    print(f"{'вимір':<32}{'пакетно, с':>12}{'поелементно, с':>16}{'бюджет, с':>12}")
+    for name, (seconds, reference, same) in measure(args.rows, args.sample).items():
+        budget = budget_for(name, args.rows)
+        reference_text = f"~{reference:.2f}" if reference is not None else "—"
+        mark = "" if seconds <= budget else "  <-- понад бюджет"
+        print(f"{name:<32}{seconds:>12.3f}{reference_text:>16}{budget:>12.2f}{mark}")
+
+        if mark:
+            failures.append(f"{name}: {seconds:.3f} с > {budget:.2f} с")
+        if not same:
+            failures.append(f"{name}: результат відрізняється від поелементної версії")
+
+    if failures:
+        print("\nПеревищено бюджет або розбіжність:\n  " + "\n  ".join(failures))
+        return 1 if args.strict else 0
+
+    print("\nУсі бюджети дотримано.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
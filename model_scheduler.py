@@ -0,0 +1,254 @@
+import heapq
+import json
+import math
+import os
+import time
+import logging
+from pathlib import Path
+from config_manager import ConfigManager
+
+
+class ModelScheduler:
+
+    """
+    Планувальник сканування окремих моделей за їхньою активністю.
+
+    Для кожної моделі згладжено (EWMA) рахуються нові оголошення за годину,
+    частка нових оголошень, що стали гарячими пропозиціями, та вартість
+    одного сканування в запитах до сторінок каталогу. Інтервали розподіляють
+    бюджет requests_per_hour за правилом квадратного кореня:
+    interval ~ sqrt(вартість / цінність), що мінімізує середню затримку
+    виявлення нової пропозиції. Активні моделі скануються частіше, тихі —
+    рідше, але не рідше max_interval.
+
+    Черга наступних запусків — купа (next_due, model); застарілі записи
+    відкидаються при вибиранні. Стан зберігається в JSON між перезапусками.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1800, requests_per_hour: float = None,
+                 min_interval: float = 600, max_interval: float = 6 * 3600,
+                 smoothing: float = 0.3, hit_weight: float = 4.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.requests_per_hour = requests_per_hour
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.smoothing = smoothing
+        self.hit_weight = hit_weight
+
+        #model -> {last_scan, next_due, new_rate, hit_rate, cost[, retry_at]}
+        self.state = {}
+        self._heap = []
+
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати розклад моделей {self.path}: {e}")
+            self.state = {}
+
+        self._rebuild_heap()
+
+    def snapshot(self) -> dict:
+        #копія стану для збереження поза циклом подій
+        return {model: dict(entry) for model, entry in self.state.items()}
+
+    def save(self, state: dict = None):
+        state = self.state if state is None else state
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Не вдалося зберегти розклад моделей {self.path}: {e}")
+
+    def _rebuild_heap(self):
+        self._heap = [(entry['next_due'], model) for model, entry in self.state.items()]
+        heapq.heapify(self._heap)
+
+    def sync(self, models):
+
+        """
+        Узгоджує розклад зі списком моделей у config: нові моделі стають
+        до сканування одразу, видалені прибираються.
+        """
+
+        models = {str(model).lower() for model in models}
+        changed = False
+
+        for model in models - set(self.state):
+            self.state[model] = {'last_scan': None, 'next_due': 0.0, 'new_rate': None, 'hit_rate': 0.0, 'cost': None}
+            heapq.heappush(self._heap, (0.0, model))
+            changed = True
+
+        for model in set(self.state) - models:
+            del self.state[model]
+            changed = True
+
+        if changed:
+            self._rebuild_heap()
+
+    def _valid_top(self):
+        #запис у купі актуальний, лише якщо збігається з next_due моделі
+        while self._heap:
+            due, model = self._heap[0]
+            entry = self.state.get(model)
+            if entry is not None and entry['next_due'] == due:
+                return due, model
+            heapq.heappop(self._heap)
+        return None
+
+    def next_due(self) -> float:
+        top = self._valid_top()
+        return top[0] if top else None
+
+    def due(self, now: float = None) -> list:
+
+        """
+        Моделі, час сканування яких настав.
+        """
+
+        now = time.time() if now is None else now
+        models = []
+
+        while True:
+            top = self._valid_top()
+            if top is None or top[0] > now:
+                break
+            heapq.heappop(self._heap)
+            models.append(top[1])
+
+        #поки моделі не проскановані, вони лишаються в черзі
+        for model in models:
+            heapq.heappush(self._heap, (self.state[model]['next_due'], model))
+
+        return models
+
+    def _ewma(self, old, value: float) -> float:
+        return value if old is None else self.smoothing * value + (1 - self.smoothing) * old
+
+    def record(self, models, progress, finished_at: float = None):
+
+        """
+        Оновлює статистику просканованих моделей за лічильниками ScanProgress
+        і перераховує розклад усіх моделей. Стан не зберігається на диск —
+        це робить викликач через save(snapshot()).
+        """
+
+        finished_at = time.time() if finished_at is None else finished_at
+
+        for model in {str(model).lower() for model in models}:
+            entry = self.state.get(model)
+            if entry is None:
+                continue
+
+            new = progress.new_by_model.get(model, 0)
+            deals = progress.deals_by_model.get(model, 0)
+            #деталі кожного нового оголошення качаються один раз за будь-якого
+            #розкладу, тож від частоти сканування залежать лише сторінки каталогу
+            cost = progress.pages_by_model.get(model, 0)
+
+            if entry['last_scan'] is not None:
+                hours = max((finished_at - entry['last_scan']) / 3600, 1 / 60)
+                entry['new_rate'] = self._ewma(entry['new_rate'], new / hours)
+            if new:
+                entry['hit_rate'] = self._ewma(entry['hit_rate'], min(1.0, deals / new))
+            if cost:
+                entry['cost'] = self._ewma(entry['cost'], cost)
+
+            entry['last_scan'] = finished_at
+            #вдале сканування знімає відкладення після попередньої невдачі
+            entry.pop('retry_at', None)
+
+        self.reschedule(finished_at)
+
+    def intervals(self) -> dict:
+
+        """
+        Інтервал сканування кожної моделі в секундах.
+
+        Моделі без статистики скануються з базовим check_interval; решта
+        ділить залишок бюджету пропорційно sqrt(cost * value). Якщо бюджет
+        не задано, він дорівнює навантаженню від сканування всіх моделей
+        кожні check_interval, тож загальна кількість запитів не зростає.
+        """
+
+        costs = [entry['cost'] for entry in self.state.values() if entry['cost']]
+        default_cost = sum(costs) / len(costs) if costs else 1.0
+
+        budget = self.requests_per_hour
+        if not budget:
+            budget = sum((entry['cost'] or default_cost) for entry in self.state.values()) * 3600 / self.check_interval
+
+        intervals = {}
+        weights = {}
+        for model, entry in self.state.items():
+            if entry['new_rate'] is None or not entry['cost']:
+                intervals[model] = self.check_interval
+                budget -= (entry['cost'] or default_cost) * 3600 / self.check_interval
+            else:
+                value = entry['new_rate'] * (1 + self.hit_weight * entry['hit_rate']) + 1e-3
+                weights[model] = (entry['cost'], value)
+
+        if weights:
+            total = sum(math.sqrt(cost * value) for cost, value in weights.values())
+            for model, (cost, value) in weights.items():
+                interval = math.sqrt(cost / value) * total / budget * 3600 if budget > 0 else self.max_interval
+                intervals[model] = min(self.max_interval, max(self.min_interval, interval))
+
+        return intervals
+
+    def postpone(self, models, delay: float):
+
+        """
+        Відкладає моделі після невдалого сканування, щоб не повторювати його одразу.
+        Відкладення діє до наступного вдалого сканування моделі, тож
+        перерахунок розкладу після сканування інших моделей його не скасовує.
+        """
+
+        due = time.time() + delay
+        for model in {str(model).lower() for model in models}:
+            entry = self.state.get(model)
+            if entry is not None:
+                entry['retry_at'] = due
+                entry['next_due'] = max(entry['next_due'], due)
+                heapq.heappush(self._heap, (entry['next_due'], model))
+
+    def reschedule(self, now: float = None):
+        now = time.time() if now is None else now
+
+        for model, interval in self.intervals().items():
+            entry = self.state[model]
+            last_scan = entry['last_scan']
+            next_due = last_scan + interval if last_scan is not None else now
+            entry['next_due'] = max(next_due, entry.get('retry_at') or 0.0)
+            entry['interval'] = interval
+
+        self._rebuild_heap()
+
+
+_model_scheduler = None
+
+
+def get_model_scheduler(config: ConfigManager = None) -> ModelScheduler:
+    global _model_scheduler
+
+    if _model_scheduler is None:
+        config = config or ConfigManager()
+        _model_scheduler = ModelScheduler(
+            config.data.get('path_model_schedule', 'data/model_schedule.json'),
+            check_interval=config.data.get('check_interval', 30) * 60,
+            requests_per_hour=config.data.get('scan_requests_per_hour'),
+            min_interval=config.data.get('scan_min_interval', 10) * 60,
+            max_interval=config.data.get('scan_max_interval', 360) * 60
+        )
+
+    return _model_scheduler
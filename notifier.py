@@ -0,0 +1,239 @@
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError
+from config_manager import ConfigManager
+from rate_limiter import HostRateLimiter
+
+
+class SubscriberRegistry:
+
+    """
+    Чати, які отримують сповіщення про нові пропозиції.
+
+    Зберігаються в config['subscribers'] як {chat_id: налаштування чату}.
+    Чат адміністратора з config['chat_id'] отримує сповіщення завжди.
+    """
+
+    def __init__(self, config: ConfigManager):
+        self.config = config
+
+    @property
+    def subscribers(self) -> dict:
+        return self.config.data.setdefault('subscribers', {})
+
+    def chat_ids(self) -> list:
+        chat_ids = list(self.subscribers)
+
+        admin = self.config.data.get('chat_id')
+        if admin and str(admin) not in self.subscribers:
+            chat_ids.insert(0, str(admin))
+
+        return chat_ids
+
+    def __contains__(self, chat_id) -> bool:
+        return str(chat_id) in self.subscribers
+
+    def __len__(self):
+        return len(self.chat_ids())
+
+    def add(self, chat_id) -> bool:
+        if chat_id in self:
+            return False
+
+        self.subscribers[str(chat_id)] = {}
+        self.config.save()
+        return True
+
+    def remove(self, chat_id) -> bool:
+        if self.subscribers.pop(str(chat_id), None) is None:
+            return False
+
+        self.config.save()
+        return True
+
+    def settings(self, chat_id) -> dict:
+        return self.subscribers.get(str(chat_id)) or {}
+
+    def set_settings(self, chat_id, settings: dict):
+        #збереження фільтра заодно підписує чат на сповіщення
+        self.subscribers[str(chat_id)] = settings
+        self.config.save()
+
+
+class NotificationDispatcher:
+
+    """
+    Асинхронна черга надсилання сповіщень з обмеженням швидкості Telegram.
+
+    Загальний ліміт (rate повідомлень/сек) тримає token bucket HostRateLimiter,
+    а кожен чат отримує не більше одного повідомлення за chat_interval секунд.
+    Кілька сповіщень, що чекають для одного чату, зливаються в останнє.
+    RetryAfter відкладає чат на вказаний Telegram час і знижує загальну
+    швидкість; чати, що заблокували бота, прибираються з реєстру.
+    submit не чекає на відправку, тож планувальник не блокується.
+    """
+
+    def __init__(self, bot: Bot, rate: float = 30.0, chat_interval: float = 1.0, concurrency: int = 8,
+                 max_retries: int = 3, registry: SubscriberRegistry = None):
+        self.bot = bot
+        self.limiter = HostRateLimiter(
+            rate=rate, min_rate=max(1.0, rate / 4), max_rate=rate,
+            burst=1.0, increase_step=rate / 100
+        )
+        self.chat_interval = chat_interval
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.registry = registry
+
+        #chat_id -> (text, kwargs, номер спроби)
+        self._pending = OrderedDict()
+        #chat_id -> момент, з якого чату знову можна писати
+        self._ready_at = {}
+        self._workers = set()
+        #повідомлення, які воркери вже взяли з черги, але ще не надіслали
+        self._in_flight = 0
+
+    def submit(self, chat_id, text: str, **kwargs):
+
+        """
+        Ставить повідомлення в чергу. Якщо для цього чату вже є невідправлене
+        сповіщення, воно замінюється новішим.
+        """
+
+        chat_id = str(chat_id)
+        self._pending.pop(chat_id, None)
+        self._pending[chat_id] = (text, kwargs, 0)
+        self._start()
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+
+        self._workers = {task for task in self._workers if not task.done()}
+        while len(self._workers) < min(self.concurrency, len(self._pending)):
+            self._workers.add(loop.create_task(self._worker()))
+
+    def _take(self) -> tuple:
+
+        """
+        Бере перший чат із черги, якому вже можна писати.
+
+        Returns:
+            tuple: (chat_id, повідомлення, 0) або (None, None, скільки чекати).
+        """
+
+        now = time.monotonic()
+        earliest = None
+
+        for chat_id in self._pending:
+            ready = self._ready_at.get(chat_id, 0.0)
+            if ready <= now:
+                #поки повідомлення в дорозі, інші воркери цей чат не беруть
+                self._ready_at[chat_id] = float('inf')
+                return chat_id, self._pending.pop(chat_id), 0.0
+            earliest = ready if earliest is None else min(earliest, ready)
+
+        wait = earliest - now if earliest is not None and earliest != float('inf') else self.chat_interval
+        return None, None, wait
+
+    async def _worker(self):
+        while self._pending:
+            chat_id, message, wait = self._take()
+            if chat_id is None:
+                await asyncio.sleep(wait)
+                continue
+
+            self._in_flight += 1
+            try:
+                delay = self.limiter.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                await self._send(chat_id, *message)
+            finally:
+                self._in_flight -= 1
+                #перерване (скасоване) надсилання не має лишати чат заблокованим
+                if self._ready_at.get(chat_id) == float('inf'):
+                    self._ready_at.pop(chat_id, None)
+
+    async def _send(self, chat_id: str, text: str, kwargs: dict, attempt: int):
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            self.limiter.on_success()
+            self._ready_at[chat_id] = time.monotonic() + self.chat_interval
+
+        except TelegramRetryAfter as e:
+            self.limiter.on_throttle()
+            self._ready_at[chat_id] = time.monotonic() + e.retry_after
+
+            if attempt < self.max_retries:
+                #новіше сповіщення, що надійшло за цей час, має перевагу
+                self._pending.setdefault(chat_id, (text, kwargs, attempt + 1))
+            else:
+                logging.warning(f"Сповіщення для чату {chat_id} не надіслано після {attempt + 1} спроб (RetryAfter).")
+
+        except TelegramForbiddenError:
+            self._ready_at.pop(chat_id, None)
+            logging.warning(f"Чат {chat_id} заблокував бота, його прибрано з підписників.")
+            if self.registry is not None:
+                self.registry.remove(chat_id)
+
+        except Exception as e:
+            self._ready_at[chat_id] = time.monotonic() + self.chat_interval
+            logging.error(f"Не вдалося надіслати сповіщення в чат {chat_id}: {e}")
+
+    async def _drain(self):
+        while self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = {task for task in self._workers if not task.done()}
+
+    async def flush(self, timeout: float = None) -> bool:
+
+        """
+        Чекає, поки черга сповіщень спорожніє, але не довше timeout секунд.
+        Після тайм-ауту воркери зупиняються, а невідправлені сповіщення губляться.
+
+        Returns:
+            bool: True, якщо всі сповіщення надіслано.
+        """
+
+        drain = asyncio.ensure_future(self._drain())
+        done, _ = await asyncio.wait({drain}, timeout=timeout)
+        if done:
+            return True
+
+        logging.warning(f"Не надіслано {len(self._pending) + self._in_flight} сповіщень за {timeout} с очікування.")
+        drain.cancel()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(drain, *self._workers, return_exceptions=True)
+        return False
+
+
+_notifier = None
+
+
+async def flush_notifier(timeout: float = None) -> bool:
+    #при зупинці бота черга має спорожніти до закриття сесії Telegram
+    if _notifier is None:
+        return True
+    return await _notifier.flush(timeout)
+
+
+def get_notifier(bot: Bot, config: ConfigManager = None) -> NotificationDispatcher:
+    global _notifier
+
+    if _notifier is None:
+        config = config or ConfigManager()
+        _notifier = NotificationDispatcher(
+            bot,
+            rate=config.data.get('notify_rate', 30.0),
+            chat_interval=config.data.get('notify_chat_interval', 1.0),
+            concurrency=config.data.get('notify_concurrency', 8),
+            max_retries=config.data.get('notify_max_retries', 3),
+            registry=SubscriberRegistry(config)
+        )
+
+    return _notifier
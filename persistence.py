@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+
+class PersistenceSink:
+
+    """
+    Фоновий запис результатів конвеєра на диск.
+
+    Кожне завдання має ключ (наприклад, назву таблиці): якщо попередній запис
+    з тим самим ключем ще не почався, він замінюється новішим. Завдання
+    виконуються по черзі в окремому потоці, не блокуючи цикл бота.
+    """
+
+    def __init__(self):
+        self._pending = OrderedDict()
+        self._task = None
+
+    def submit(self, key: str, func, *args):
+        self._pending.pop(key, None)
+        self._pending[key] = (func, args)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            key, (func, args) = self._pending.popitem(last=False)
+            try:
+                await asyncio.to_thread(func, *args)
+            except Exception as e:
+                logging.error(f"Помилка фонового збереження '{key}': {e}", exc_info=True)
+
+    async def flush(self):
+
+        """
+        Чекає, поки всі заплановані записи завершаться.
+        """
+
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from config_manager import ConfigManager
+from LaptopBase import LaptopBase
+from persistence import PersistenceSink
+from scraper import scrape_listings, save_listings
+from analysis_engine import find_hot_deals, get_market_stats
+from storage import LISTINGS
+
+
+async def run_pipeline(laptops: LaptopBase, config: ConfigManager, sink: PersistenceSink, progress=None,
+                       models: list = None) -> bool:
+
+    """
+    Повний цикл сканування -> аналіз -> оновлення бази бота, де етапи
+    передають один одному DataFrame у пам'яті. Збереження listings, історії,
+    статистики ринку та hot_deals іде у фоні через sink, тож до розсилки
+    сповіщень аналіз не чекає на диск. Запускається через ScanCoordinator,
+    який не дає двом скануванням іти одночасно і веде progress. Якщо задано
+    models, скануються лише вони, а оголошення решти моделей беруться
+    з попереднього сканування.
+
+    Returns:
+        bool: True — є нові дані, None — оголошень не знайдено, False — помилка.
+    """
+
+    listings = await scrape_listings(config, progress, models)
+    if listings is None:
+        return False
+
+    sink.submit(LISTINGS, save_listings, config, listings)
+    if listings.empty:
+        return None
+
+    if progress is not None:
+        progress.stage = "analysis"
+
+    hot_deals = await asyncio.to_thread(find_hot_deals, listings, config, False)
+    if hot_deals is None:
+        return False
+
+    market_stats = get_market_stats(config)
+    sink.submit("market_stats", market_stats.save, market_stats.snapshot())
+
+    added = laptops.update(hot_deals, persist=False)
+
+    if progress is not None and added:
+        #про ці пропозиції ще не сповіщали: решта вже була в базі до цього сканування
+        progress.new_deal_ids = added
+        fresh = hot_deals[hot_deals['id'].isin(added)]
+        progress.deals_by_model = fresh['category'].astype(str).str.lower().value_counts().to_dict()
+
+    if not laptops.df.empty and 'is_new' in laptops.df.columns:
+        laptops.df = laptops.df.sort_values(by='is_new', ascending=False, kind='stable').reset_index(drop=True)
+        logging.info("Дані відсортовані: нові оголошення вгорі.")
+
+    #потік запису отримує знімок, а не df, який бот може змінити тим часом
+    sink.submit(laptops.table, laptops.save, laptops.df.copy())
+    return True
@@ -0,0 +1,190 @@
+import time
+import random
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+#статуси, після яких сайт просить нас пригальмувати
+THROTTLE_STATUSES = {403, 429}
+#статуси, які має сенс повторити
+RETRY_STATUSES = THROTTLE_STATUSES | {500, 502, 503, 504}
+
+
+def parse_retry_after(value: str) -> float:
+
+    """
+    Перетворює заголовок Retry-After у кількість секунд.
+
+    Args:
+        value (str): Значення заголовка (секунди або HTTP-дата).
+
+    Returns:
+        float: Кількість секунд очікування або None, якщо заголовок некоректний.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+
+    """
+    Експоненційна затримка з повним джитером (full jitter).
+
+    Args:
+        attempt (int): Номер спроби, починаючи з 0.
+
+    Returns:
+        float: Випадкова затримка в діапазоні [0, min(cap, base * 2^attempt)].
+    """
+
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class HostRateLimiter:
+
+    """
+    Token bucket для одного хоста зі швидкістю, що підлаштовується за AIMD:
+    кожна успішна відповідь додає increase_step запитів/сек,
+    а 429/403 множить швидкість на decrease_factor.
+    """
+
+    def __init__(self, rate: float = 1.0, min_rate: float = 0.2, max_rate: float = 5.0,
+                 burst: float = 2.0, increase_step: float = 0.05, decrease_factor: float = 0.5):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.burst = max(1.0, burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+
+        self.tokens = self.burst
+        self.blocked_until = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self) -> float:
+
+        """
+        Резервує один токен і повертає, скільки секунд треба почекати перед запитом.
+        Токени можуть йти в мінус — так наступні запити стають у чергу.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+            return max(wait, self.blocked_until - now)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: float = None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = min(self.tokens, 0.0)
+
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class AdaptiveRateLimiter:
+
+    """
+    Спільний для всіх запитів набір лімітерів HostRateLimiter (по одному на хост).
+    Потокобезпечний, тож його можна ділити між async-рушієм і фоновими потоками.
+    """
+
+    def __init__(self, **limiter_kwargs):
+        self.limiter_kwargs = limiter_kwargs
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> HostRateLimiter:
+        host = urlsplit(url).netloc
+
+        with self._lock:
+            limiter = self.hosts.get(host)
+            if limiter is None:
+                limiter = HostRateLimiter(**self.limiter_kwargs)
+                self.hosts[host] = limiter
+            return limiter
+
+    def reserve(self, url: str) -> float:
+        return self.get(url).reserve()
+
+    def on_success(self, url: str):
+        self.get(url).on_success()
+
+    def on_throttle(self, url: str, retry_after: float = None):
+        limiter = self.get(url)
+        limiter.on_throttle(retry_after)
+        logging.info(f"Швидкість для {urlsplit(url).netloc} знижено до {limiter.rate:.2f} запитів/сек.")
+
+    def log(self):
+        for host, limiter in list(self.hosts.items()):
+            logging.info(f"Ліміт для {host}: {limiter.rate:.2f} запитів/сек.")
+
+
+class AdaptiveConcurrency:
+
+    """
+    Підбирає кількість одночасних запитів за спостережуваною затримкою та
+    часткою помилок (AIMD): кожні window відповідей ліміт зростає на 1,
+    якщо все добре, або зменшується на чверть при повільних відповідях чи помилках.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 12,
+                 target_latency: float = 2.0, max_error_rate: float = 0.1, window: int = 20):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.window = window
+
+        self._latencies = []
+        self._errors = 0
+
+    def record(self, latency: float, ok: bool):
+        self._latencies.append(latency)
+        if not ok:
+            self._errors += 1
+
+        if len(self._latencies) < self.window:
+            return
+
+        latencies = sorted(self._latencies)
+        median_latency = latencies[len(latencies) // 2]
+        error_rate = self._errors / len(latencies)
+
+        if error_rate > self.max_error_rate or median_latency > self.target_latency:
+            self.limit = max(self.minimum, int(self.limit * 0.75))
+        elif self._errors == 0:
+            self.limit = min(self.maximum, self.limit + 1)
+
+        logging.debug(f"Паралельність: {self.limit} (затримка {median_latency:.2f} с, помилок {error_rate:.0%})")
+
+        self._latencies = []
+        self._errors = 0
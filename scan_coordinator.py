@@ -0,0 +1,134 @@
+import asyncio
+import time
+import logging
+from dataclasses import dataclass, field
+
+
+STAGES = {
+    "pages": "сторінки каталогу",
+    "details": "деталі оголошень",
+    "analysis": "аналіз цін",
+    "done": "завершено",
+}
+
+
+@dataclass
+class ScanProgress:
+
+    stage: str = "pages"
+    pages_done: int = 0
+    listings_found: int = 0
+    details_total: int = 0
+    details_done: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    #лічильники по моделях для планувальника (див. model_scheduler.py)
+    pages_by_model: dict = field(default_factory=dict)
+    new_by_model: dict = field(default_factory=dict)
+    deals_by_model: dict = field(default_factory=dict)
+    #id гарячих пропозицій, яких до цього сканування в базі бота не було
+    new_deal_ids: list = field(default_factory=list)
+
+    def describe(self) -> str:
+        elapsed = int(time.monotonic() - self.started_at)
+        lines = [
+            f"⏱ Триває: {elapsed // 60}:{elapsed % 60:02d}",
+            f"📄 Сторінок каталогу: {self.pages_done} (оголошень: {self.listings_found})",
+        ]
+        if self.details_total:
+            lines.append(f"🔎 Деталі: {self.details_done}/{self.details_total}")
+        lines.append(f"Етап: {STAGES.get(self.stage, self.stage)}")
+        return "\n".join(lines)
+
+
+class ScanCoordinator:
+
+    """
+    Єдина точка запуску конвеєра сканування (single-flight).
+
+    Поки сканування триває, нові запити (/scan від кількох користувачів,
+    планувальник) приєднуються до нього й отримують той самий результат
+    замість запуску ще одного обходу OLX. Сканування лише частини моделей
+    приєднує тільки ті запити, які воно покриває. Хід сканування видно
+    в progress, а після завершення статистика моделей потрапляє в
+    ModelScheduler, який від цього моменту відраховує наступні запуски.
+    """
+
+    def __init__(self, laptops, config, sink):
+        self.laptops = laptops
+        self.config = config
+        self.sink = sink
+
+        self.progress = None
+        self.finished_at = None
+        self._task = None
+        self._models = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _covers(self, models: list) -> bool:
+        return self._models is None or (models is not None and set(models) <= set(self._models))
+
+    async def run(self, models: list = None):
+
+        """
+        Запускає сканування або приєднується до поточного.
+
+        Args:
+            models (list): Моделі для сканування; None — всі моделі з config.
+
+        Returns:
+            Результат run_pipeline: True, None або False.
+        """
+
+        result, _ = await self.run_with_progress(models)
+        return result
+
+    async def run_with_progress(self, models: list = None) -> tuple:
+
+        """
+        Те саме, що run, але разом із результатом повертає ScanProgress
+        саме цього сканування: self.progress на момент повернення може
+        вже належати наступному.
+
+        Returns:
+            tuple: (результат run_pipeline, ScanProgress).
+        """
+
+        #поточне сканування не охоплює потрібні моделі — чекаємо його завершення
+        while self.running and not self._covers(models):
+            await asyncio.wait({self._task})
+
+        if not self.running:
+            self.progress = ScanProgress()
+            self._models = list(models) if models is not None else None
+            self._task = asyncio.get_running_loop().create_task(self._scan(self.progress, self._models))
+        else:
+            logging.info("Сканування вже триває — запит приєднано до нього.")
+
+        progress = self.progress
+        #скасування одного з очікувачів не зупиняє спільне сканування
+        return await asyncio.shield(self._task), progress
+
+    async def _scan(self, progress: ScanProgress, models: list):
+        from pipeline import run_pipeline
+        from model_scheduler import get_model_scheduler
+
+        result = False
+        try:
+            result = await run_pipeline(self.laptops, self.config, self.sink, progress, models)
+            return result
+        finally:
+            progress.stage = "done"
+            self.finished_at = time.monotonic()
+
+            #розклад змінюється лише в циклі подій, щоб не конкурувати з планувальником
+            scheduler = get_model_scheduler(self.config)
+            scanned = models if models is not None else self.config.data.get('models', [])
+            if result is not False:
+                scheduler.record(scanned, progress)
+            else:
+                scheduler.postpone(scanned, scheduler.min_interval)
+            #на диск пишеться знімок стану, щоб не блокувати цикл подій
+            await asyncio.to_thread(scheduler.save, scheduler.snapshot())
@@ -1,72 +1,57 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import json
 import time
 import pandas as pd
+import numpy as np
 import re
-import random
+import math
 import logging
 from fake_headers import Headers
-from rapidfuzz import process, fuzz
-from concurrent.futures import ThreadPoolExecutor
 from config_manager import ConfigManager
 from LaptopBase import LaptopItem
-from itertools import repeat
+from http_client import HostStats
+from crawl_engine import CrawlEngine
+from detail_cache import DetailCache
+from storage import get_storage, LISTINGS
+from history import get_history
+import html_parser
+from html_parser import parse_html
+from matching import detect_spam_batch, CategoryMatcher
+from rate_limiter import AdaptiveRateLimiter
 
 
-config = ConfigManager()
+#кеш категорій за нормалізованим заголовком, спільний для всіх циклів сканування
+category_matcher = CategoryMatcher()
+#OLX віддає не більше 25 сторінок видачі
+MAX_PAGES = 25
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%H:%M:%S'
-)
+#статистика трафіку та лімітер створюються при першому запиті, а не під час імпорту
+_host_stats = None
+_rate_limiter = None
 
-selectors = config.data["selectors"]
-target_models = list(map(lambda x: x.lower(),config.data['models']))
-black_list = list(map(lambda x: x.lower(), config.data['blacklist']))
-headers = [str(Headers()) for x in range(15)]
 
-#функція для отримання html сторінки з оголошенням 
-def fetch_html(url: str, headers: list) -> tuple[str, str]:
+def get_host_stats() -> HostStats:
+    global _host_stats
 
-    """
-    Виконує безпечний HTTP-запит до сайту з імітацією користувача.
+    if _host_stats is None:
+        _host_stats = HostStats()
 
-    Args:
-        url (str): Посилання на сторінку.
-        headers (list): Список User-Agent заголовків.
+    return _host_stats
 
-    Returns:
-        tuple[str, str]: Повертає (html_text, actual_url). 
-                         Якщо помилка - повертає (None, None).
-    """
 
-    try:         
-        header = {'User-Agents': random.choice(headers)} 
-        time.sleep(random.randint(1,5))
+def get_rate_limiter(config: ConfigManager = None) -> AdaptiveRateLimiter:
+    global _rate_limiter
 
-        response = requests.get(url, headers = header, timeout=10)
+    if _rate_limiter is None:
+        config = config or ConfigManager()
+        _rate_limiter = AdaptiveRateLimiter(
+            rate=config.data.get('rate_limit', 1.0),
+            min_rate=config.data.get('rate_limit_min', 0.2),
+            max_rate=config.data.get('rate_limit_max', 5.0)
+        )
+
+    return _rate_limiter
 
-        if response.status_code == 403:
-            logging.warning(f"Доступ заборонено (403) для {url}. Можливо, IP заблоковано.")
-            return None, None
-        elif response.status_code == 429:
-            logging.warning(f"Занадто багато запитів (429). Треба збільшити паузу!")
-            return None, None
-        
-        response.raise_for_status()
-        return response.text,response.url
-
-    except requests.exceptions.HTTPError as e:
-        logging.error(f"HTTP помилка для {url}: {e}")
-    except requests.exceptions.ConnectionError:
-        logging.error(f"Помилка з'єднання з мережею при спробі відкрити {url}")
-    except requests.exceptions.Timeout:
-        logging.error(f"Таймаут (10 сек) при завантаженні {url}")
-    except Exception as e:
-        logging.error(f"Непередбачена помилка: {e}", exc_info=True)
-        
-    return None, None
 
 #функція для витягування ід з посилання на оголошення
 def extract_advertisement_id(url: str) -> str:
@@ -108,7 +93,7 @@ def parse_and_save(html: str, selectors: dict) -> list[LaptopItem]:
     items_list = []
 
     try:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = parse_html(html, selectors, ['ad_card'])
         cards = soup.find_all('div', attrs=selectors.get("ad_card",{}))
         
         if not cards:
@@ -163,14 +148,90 @@ def parse_and_save(html: str, selectors: dict) -> list[LaptopItem]:
     
     return items_list
 
+#функція для визначення кількості сторінок у видачі
+def parse_page_count(html: str, selectors: dict, per_page: int) -> int:
+
+    """
+    Визначає кількість сторінок видачі з першої сторінки каталогу:
+    спершу за блоком пагінації, інакше за лічильником знайдених оголошень.
+
+    Args:
+        html (str): HTML першої сторінки каталогу.
+        selectors (dict): Селектори з конфігу.
+        per_page (int): Кількість карток на першій сторінці.
+
+    Returns:
+        int: Кількість сторінок або None, якщо індикатор не знайдено.
+    """
+
+    try:
+        soup = parse_html(html, selectors, ['pagination', 'total_count'])
+
+        if selectors.get('pagination'):
+            pagination = soup.find(attrs=selectors['pagination'])
+            if pagination:
+                pages = [int(n) for n in re.findall(r'\d+', pagination.get_text(" ", strip=True))]
+                if pages:
+                    return max(pages)
+
+        if selectors.get('total_count') and per_page:
+            total_tag = soup.find(attrs=selectors['total_count'])
+            if total_tag:
+                digits = re.sub(r'\D', '', total_tag.get_text(strip=True))
+                if digits:
+                    return max(1, math.ceil(int(digits) / per_page))
+
+    except Exception as e:
+        logging.error(f"Помилка при визначенні кількості сторінок: {e}")
+
+    return None
+
+
+#функція для завантаження однієї сторінки каталогу
+async def fetch_listing_page(engine: CrawlEngine, link: str, headers: list, selectors: dict,
+                             with_count: bool = False) -> tuple[list[LaptopItem], str, int]:
+
+    """
+    Завантажує та парсить одну сторінку каталогу.
+
+    Returns:
+        tuple: (список LaptopItem, фактичний URL, кількість сторінок або None).
+               Якщо сторінку не вдалося завантажити - (None, None, None).
+    """
+
+    try:
+        html, res_link = await engine.fetch(link, headers)
+        if html is None:
+            return None, None, None
+
+        data = await asyncio.to_thread(parse_and_save, html, selectors)
+        page_count = await asyncio.to_thread(parse_page_count, html, selectors, len(data)) if with_count else None
+
+        return data, res_link, page_count
+
+    except Exception as e:
+        logging.error(f"Помилка при завантаженні сторінки {link}: {e}", exc_info=True)
+        return None, None, None
+
+
 #функція отримання цільових оголошень з OLX
-def target_scrap_OLX(url: str, headers: list, targets: list, selectors: dict) -> pd.DataFrame:
+async def target_scrap_OLX(engine: CrawlEngine, url: str, headers: list, targets: list, selectors: dict,
+                           known_ids: set = None, stop_after: int = 0, page_fanout: int = 5,
+                           progress=None) -> pd.DataFrame:
 
     """
     Основна функція сканування. Проходить по сторінках оголошень для заданих моделей.
+
+    Перша сторінка повідомляє загальну кількість сторінок, після чого решта
+    завантажується паралельно хвилями по page_fanout сторінок.
     
     Args:
+        engine (CrawlEngine): Спільний асинхронний рушій завантаження.
         targets (list): Список моделей (або одна модель у списку) для пошуку.
+        known_ids (set): ID вже відомих оголошень. Якщо задано — інкрементальний режим.
+        stop_after (int): Скільки сторінок поспіль лише з відомими ID зупиняють пошук.
+        page_fanout (int): Скільки сторінок однієї моделі завантажувати одночасно.
+        progress (ScanProgress): Лічильники ходу сканування (див. scan_coordinator.py).
     """
 
     all_laptops = []
@@ -179,28 +240,70 @@ def target_scrap_OLX(url: str, headers: list, targets: list, selectors: dict) ->
     for model in targets:
 
         logging.info(f"Почався пошук моделі: {model}.")
+        base_link = url + f"{model.replace(' ', '%20')}/?page="
 
-        for i in range(1,26):
-            try:
-                link = url + f"{model.replace(' ', '%20')}/?page={i}"
+        known_pages = 0
+        page_count = None
+        last_page = MAX_PAGES
+        page = 1
 
-                html, res_link = fetch_html(link, headers)
+        while page <= last_page:
+
+            #поки кількість сторінок невідома, йдемо по одній, щоб не качати зайвого
+            wave_size = max(1, page_fanout) if page_count else 1
+            #в інкрементальному режимі не забігаємо далеко за можливу точку зупинки
+            if known_ids is not None and stop_after > 0:
+                wave_size = min(wave_size, stop_after)
+            wave = list(range(page, min(last_page, page + wave_size - 1) + 1))
+
+            results = await asyncio.gather(*(
+                fetch_listing_page(engine, base_link + str(i), headers, selectors, with_count=(i == 1))
+                for i in wave
+            ))
+
+            stop = False
+
+            for i, (data, res_link, count) in zip(wave, results):
+                try:
+                    link = base_link + str(i)
+
+                    if data is None:
+                        logging.warning(f"Пропущено сторінку {i} для {model} через помилку завантаження.")
+                        continue
+
+                    if i == 1 and count:
+                        page_count = count
+                        last_page = min(MAX_PAGES, page_count)
+                        logging.info(f"Для {model} знайдено сторінок: {page_count}.")
+
+                    if not data or ((res_link != link) and i!=1):
+                        logging.info(f"Досягнуто кінець списку для {model} на сторінці {i}.")
+                        stop = True
+                        break
 
-                if html is None:
-                    logging.warning(f"Пропущено сторінку {i} для {model} через помилку завантаження.")
-                    continue
-                
-                data = parse_and_save(html, selectors)
-                if not data or ((res_link != link) and i!=1):
-                    logging.info(f"Досягнуто кінець списку для {model} на сторінці {i}.")
-                    break
-                
-                else:
                     all_laptops.extend(data)
                     logging.info(f"Сторінка {i} ({model}): додано {len(data)} оголошень.")
 
-            except Exception as e:
-                logging.warning(f"Помилка при зчитуванні сторінки {i} для товара {model}")
+                    if progress is not None:
+                        progress.pages_done += 1
+                        progress.listings_found += len(data)
+                        progress.pages_by_model[model] = progress.pages_by_model.get(model, 0) + 1
+
+                    if known_ids is not None and stop_after > 0:
+                        known_pages = known_pages + 1 if all(item.id in known_ids for item in data) else 0
+
+                        if known_pages >= stop_after:
+                            logging.info(f"Сторінки {i - known_pages + 1}-{i} ({model}) містять лише відомі оголошення. Зупиняємо пошук.")
+                            stop = True
+                            break
+
+                except Exception as e:
+                    logging.warning(f"Помилка при зчитуванні сторінки {i} для товара {model}")
+
+            if stop:
+                break
+
+            page = wave[-1] + 1
 
     models_text = ", ".join(targets)
 
@@ -220,136 +323,66 @@ def target_scrap_OLX(url: str, headers: list, targets: list, selectors: dict) ->
     return laptops_df
 
 
-
-#функція для категоризації товарів по цільовим назвам
-def get_category(text: str, target: list) -> str:
-
-    """
-    Визначає модель ноутбука на основі заголовка за допомогою Fuzzy Matching.
-    
-    Args:
-        title (str): Заголовок оголошення.
-        target (list): Список шуканих моделей.
-    
-    Returns:
-        str: Назва моделі або "unKnown".
-    """
-
-    try:
-        if not text or not isinstance(text, str):
-            return "unKnown"
-        
-        if not target or not isinstance(target, list):
-            logging.warning(f"get_category отримала невірний тип target: {type(target)}")
-            return "unKnown"
-
-        list_models = [m[0] if isinstance(m, list) else m for m in target]
-
-        cat_res = process.extractOne(text, list_models, scorer=fuzz.token_set_ratio)
-
-        if cat_res and cat_res[1] > 90:
-            return cat_res[0]
-            
-        return "unKnown"
-    
-    except Exception as e:
-        logging.error(f"Помилка при класифікації '{text}': {e}")
-        return "unKnown"
-
-#функція перевірки тексту на наявність слів з чорного списку видає на виход True або False
-def is_spam(text: str, black_list: list) ->  bool:
+#очищення колонки цін від валюти та пробілів
+def clean_prices(prices: pd.Series) -> pd.Series:
 
     """
-    Перевіряє текст на наявність стоп-слів (спаму).
+    Очищає колонку цін без поелементного apply. Ціни на OLX часто
+    повторюються, тому regex застосовується лише до унікальних значень
+    (pd.factorize), а результат розкладається назад по кодах.
     
     Args:
-        text (str): Опис або заголовок.
-        black_list (list): Список заборонених слів.
+        prices (pd.Series): "Сирі" ціни (рядки, числа або None).
     
     Returns:
-        bool: True, якщо знайдено спам.
+        pd.Series: Ціни з типом int64, некоректні значення замінено на 0.
     """
 
-    try:
-        if not text or not isinstance(text, str):
-            return False
-        
-        if not black_list or not isinstance(black_list, list):
-            return False
+    if pd.api.types.is_numeric_dtype(prices):
+        return prices.fillna(0).astype('int64')
 
-        spam_res = process.extractOne(text, black_list, scorer=fuzz.partial_ratio)
+    codes, uniques = pd.factorize(prices)
+    uniques = pd.Series(uniques, dtype=object)
+    is_text = uniques.str.len().notna()
 
-        if spam_res and spam_res[1] > 80:
-            return True
-        
-        return False
-        
-    except Exception as e:
-        logging.error(f"Помилка при перевірці на спам '{text}': {e}")
-        return False
+    values = pd.Series(0.0, index=uniques.index)
+    values[is_text] = pd.to_numeric(uniques[is_text].str.replace(r'\D', '', regex=True), errors='coerce')
+    values[~is_text] = pd.to_numeric(uniques[~is_text], errors='coerce')
 
-#функція для очистки ціни від валюти
-def clean_price(price: str) -> int:
-
-    """
-    Очищає рядок ціни від зайвих символів і перетворює в число.
-    
-    Args:
-        price (str): "Сира" ціна (наприклад, "12 000 грн").
-    
-    Returns:
-        int: Чиста ціна (12000) або 0.
-    """
-
-    if isinstance(price, (int, float)):
-        return int(price)
-
-    if not price or not isinstance(price, str):
-        logging.debug(f"Нетипове значення ціни: {price}")
-        return 0
-    
-    try:
-        digits = re.sub(r'\D', '', price)
-        return int(digits) if digits else 0
-    
-    except Exception as e:
-        logging.error(f"Помилка при очистці ціни '{price}': {e}")
-        return 0
+    #код -1 (None/NaN) потрапляє на останній елемент — 0
+    lookup = np.append(values.fillna(0).to_numpy(), 0)
 
+    return pd.Series(lookup[codes].astype('int64'), index=prices.index, name=prices.name)
 
 
 def cleaner(data: pd.DataFrame, black_list: list) -> pd.DataFrame:
 
     """
-    Фільтрує DataFrame: видаляє спам та валідує типи даних.
+    Фільтрує DataFrame: видаляє дублікати і спам та валідує типи даних.
+    Всі кроки виконуються над колонками цілком, один прохід дедуплікації
+    і одна булева маска для фільтрації.
     """
 
-    clean_data = pd.DataFrame()
-
-    if data.empty or not isinstance(data,pd.DataFrame):
+    if not isinstance(data,pd.DataFrame) or data.empty:
         logging.warning("Cleaner отримав порожній або некоректний DataFrame.")
         return pd.DataFrame()
+
+    if 'id' not in data.columns:
+        logging.warning("Cleaner отримав некоректний DataFrame, відсутня колонка 'id'.")
+        return pd.DataFrame()
     
     start_len = len(data)
     logging.debug(f"Початкова кількість оголошень: {start_len}")
 
     try:
 
-        clean_data = data.copy()
-        
-        if 'id' in clean_data.columns:
-            clean_data.drop_duplicates(subset=['id'], keep='first', inplace=True)
-            clean_data.reset_index(inplace=True,drop=True)
-
-        else:
-            logging.warning("Cleaner отримав некоректний DataFrame, відсутня колонка 'id'.")
-            return pd.DataFrame()
+        clean_data = data[~data['id'].duplicated(keep='first')]
 
         if black_list:
-            clean_data = data[~data['offer_title'].apply(lambda x: is_spam(x, black_list))]
-            clean_data.reset_index(drop=True, inplace=True)    
-        
-        clean_data['price'] = clean_data['price'].apply(clean_price)        
+            clean_data = clean_data[~detect_spam_batch(clean_data['offer_title'], black_list)]
+
+        clean_data = clean_data.reset_index(drop=True)
+        clean_data['price'] = clean_prices(clean_data['price'])
            
     except Exception as e:
         logging.error(f"Помилка при очищенні DataFrame: {e}",exc_info=True)
@@ -361,24 +394,20 @@ def cleaner(data: pd.DataFrame, black_list: list) -> pd.DataFrame:
     return clean_data
 
 
-#функція для отримання деталей з html сторінки оголошення
-def fetch_and_parse_advert(url: str, headers: list, target_models: list, selectors: dict) -> LaptopItem:
+#функція для парсингу html сторінки оголошення
+def parse_advert(html: str, url: str, selectors: dict) -> LaptopItem:
 
     """
-    Глибокий парсинг: заходить в оголошення і дістає деталі (RAM, CPU, Опис).
+    Глибокий парсинг: дістає з html сторінки оголошення деталі (RAM, CPU, Опис).
+    У offer_title повертається заголовок зі сторінки оголошення — категорію
+    за ним визначає пакетний етап CategoryMatcher після завантаження всіх деталей.
     """
 
     ram, disk_v, cpu = 0, 0, ""
     description, img_url, title = "", "", "Без назви"
 
-    trash_pattern = r'[!\?\(\)\[\]@,\.\;\/\\"\']'
-    
     try:
-        html, _ = fetch_html(url, headers)
-        if not html:
-            return LaptopItem(id="error", offer_title="Page not found", link=url)
-
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = parse_html(html, selectors, ['ad_params', 'description', 'image_url', 'offer_title'])
 
 
         container_params = soup.find('div', selectors.get('ad_params', {}))
@@ -410,20 +439,12 @@ def fetch_and_parse_advert(url: str, headers: list, target_models: list, selecto
 
         container_title = soup.find('div', selectors.get('offer_title', {})) 
         if container_title:
-            raw_title = container_title.get_text(strip=True)
-
-        clean_title = re.sub(trash_pattern, " ", raw_title)
-            
-        clean_title = re.sub(r'\s+', ' ', clean_title).strip()
-
-        category = get_category(clean_title.lower(), target_models)
-
+            title = container_title.get_text(strip=True)
         
         return LaptopItem(
             id=extract_advertisement_id(url),
             offer_title=title,
             link=url,
-            category=category,
             image_link=img_url, 
             description=description, 
             ram=ram,
@@ -435,23 +456,45 @@ def fetch_and_parse_advert(url: str, headers: list, target_models: list, selecto
         logging.error(f"Помилка при отриманні даних про товар {url}: {e}", exc_info=True)
         return LaptopItem(id="error", offer_title="Page not found", link=url)
 
-        
-def get_details(links: list, headers: list, target_models: list, selectors: dict) -> pd.DataFrame:
+
+#функція для отримання деталей з html сторінки оголошення
+async def fetch_and_parse_advert(engine: CrawlEngine, url: str, headers: list, selectors: dict) -> LaptopItem:
 
     """
-    Запускає багатопотоковий парсинг деталей для списку посилань.
+    Заходить в оголошення і повертає його деталі. Парсинг виконується
+    в окремому потоці, щоб не блокувати event loop бота.
     """
 
-    items_details = [] 
+    try:
+        html, _ = await engine.fetch(url, headers)
+        if not html:
+            return LaptopItem(id="error", offer_title="Page not found", link=url)
+
+        return await asyncio.to_thread(parse_advert, html, url, selectors)
+
+    except Exception as e:
+        logging.error(f"Помилка при отриманні даних про товар {url}: {e}", exc_info=True)
+        return LaptopItem(id="error", offer_title="Page not found", link=url)
+
         
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        items_details = list(executor.map(
-        fetch_and_parse_advert, 
-        links, 
-        repeat(headers), 
-        repeat(target_models), 
-        repeat(selectors)
-    ))
+async def get_details(engine: CrawlEngine, links: list, headers: list, selectors: dict, progress=None) -> pd.DataFrame:
+
+    """
+    Запускає асинхронний парсинг деталей для списку посилань.
+    Кількість одночасних запитів обмежує CrawlEngine.
+    """
+
+    if progress is not None:
+        progress.stage = "details"
+        progress.details_total = len(links)
+
+    async def fetch(link: str) -> LaptopItem:
+        item = await fetch_and_parse_advert(engine, link, headers, selectors)
+        if progress is not None:
+            progress.details_done += 1
+        return item
+
+    items_details = await asyncio.gather(*(fetch(link) for link in links))
     
     valid_dicts = [
         item.to_dict() for item in items_details 
@@ -463,52 +506,189 @@ def get_details(links: list, headers: list, target_models: list, selectors: dict
     return new_details
 
 
-def run_scraper():
+#функції для збереження стану інкрементального сканування
+def load_crawl_state(path: str) -> dict:
+
+    """
+    Завантажує час останнього повного сканування для кожної моделі
+    та ID оголошень з попередніх лістингів (SEEN_IDS_KEY).
+    """
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.error(f"Не вдалося прочитати стан сканування {path}: {e}")
+        return {}
+
+
+#ключ crawl_state зі словником id -> час, коли оголошення востаннє було в лістингу
+SEEN_IDS_KEY = "seen_ids"
+
+
+def update_seen_ids(state: dict, ids, now: float, max_age_days: float = 30) -> None:
+
+    """
+    Запам'ятовує всі ID з лістингу (включно з тими, що потім відсіє cleaner
+    чи не вдасться завантажити) та забуває ті, яких не було довше за max_age_days.
+    """
+
+    seen = state.setdefault(SEEN_IDS_KEY, {})
+    for ad_id in ids:
+        seen[str(ad_id)] = now
+
+    if max_age_days:
+        border = now - max_age_days * 86400
+        state[SEEN_IDS_KEY] = {ad_id: last_seen for ad_id, last_seen in seen.items() if last_seen >= border}
+
+
+def save_crawl_state(path: str, state: dict):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+    except Exception as e:
+        logging.error(f"Не вдалося зберегти стан сканування {path}: {e}")
+
+
+async def scrape_listings(config: ConfigManager = None, progress=None, models: list = None) -> pd.DataFrame:
 
     """
-    Головна функція (Entry Point). Запускає повний цикл оновлення бази.
+    Перший етап конвеєра: сканує OLX і повертає готову таблицю оголошень
+    у пам'яті, нічого не записуючи в основне сховище. Якщо задано progress,
+    у ньому оновлюються лічильники сторінок та деталей. Якщо задано models,
+    скануються лише вони, а оголошення інших моделей переносяться
+    з попередньої бази.
+
+    Returns:
+        pd.DataFrame: Оголошення (може бути порожнім) або None у разі помилки.
     """
 
     laptops = pd.DataFrame()
 
     try:
 
-        config = ConfigManager()
+        config = config or ConfigManager()
+        host_stats = get_host_stats()
+        rate_limiter = get_rate_limiter(config)
+        host_stats.reset()
+        html_parser.configure(config.data.get('html_parser', 'html.parser'))
 
-        models = config.data.get('models', [])
+        all_models = [model.lower() for model in config.data.get('models', [])]
+        models = [model.lower() for model in models] if models is not None else all_models
         blacklist = config.data.get('blacklist', [])
         site_url = config.data.get('url')
-        path_to_save = config.data.get('path_data', 'data/laptops.csv')
+        storage = get_storage(config)
         selectors = config.data.get('selectors')
         headers = [str(Headers()) for x in range(15)]
 
         target_models = [[model.lower()] for model in models]
         black_list = [bl.lower() for bl in blacklist]
 
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            results_list = list(executor.map(
-                target_scrap_OLX,
-                repeat(site_url),        
-                repeat(headers), 
-                target_models, 
-                repeat(selectors)))
-        
-        if results_list:
-            dirt_data = pd.concat(results_list, ignore_index=True)
-        else:
-            logging.warning(f"Не знайдено жодних оголошень для моделей: {models}")
-            return False            
-        
-        clean_data = cleaner(dirt_data, black_list)
-        if clean_data.empty:
-            logging.warning("Після очищення даних не залишилося жодного оголошення.")
-            return False
-
+        engine = CrawlEngine(
+            concurrency=config.data.get('crawl_concurrency', 12),
+            per_host=config.data.get('crawl_per_host', 6),
+            pool_size=config.data.get('http_pool_size', 10),
+            stats=host_stats,
+            limiter=rate_limiter,
+            max_retries=config.data.get('max_retries', 3),
+            target_latency=config.data.get('target_latency', 2.0)
+        )
 
-        links = list(clean_data['link'])
+        #кеш деталей — JSON на десятки МБ, тож читаємо його поза циклом подій
+        detail_cache = await asyncio.to_thread(
+            DetailCache,
+            config.data.get('path_detail_cache', 'data/details_cache.json'),
+            ttl_hours=config.data.get('detail_cache_ttl_hours')
+        )
 
-        logging.info(f"Отримуємо деталі з кожного оголошення.")
-        details_df = get_details(links, headers, target_models, selectors)
+        #інкрементальний режим: моделі, які нещодавно скановані повністю,
+        #переглядаємо лише до сторінок з уже відомими оголошеннями
+        path_crawl_state = config.data.get('path_crawl_state', 'data/crawl_state.json')
+        crawl_state = await asyncio.to_thread(load_crawl_state, path_crawl_state)
+        stop_after = config.data.get('incremental_stop_pages', 2)
+        full_interval = config.data.get('full_crawl_interval_hours', 24) * 3600
+        started_at = time.time()
+
+        incremental_models = {
+            targets[0] for targets in target_models
+            if stop_after and started_at - crawl_state.get(targets[0], 0) < full_interval
+        }
+        #відомі — всі ID з попередніх лістингів, а не лише ті, що потрапили в кеш
+        #деталей: оголошення з чорного списку чи з невдалим завантаженням деталей
+        #інакше вважались би новими на кожній сторінці
+        known_ids = set(crawl_state.get(SEEN_IDS_KEY, {})) | set(detail_cache.entries)
+
+        if incremental_models:
+            logging.info(f"Інкрементальне сканування для: {', '.join(incremental_models)}.")
+
+        async with engine:
+            results_list = await asyncio.gather(*(
+                target_scrap_OLX(
+                    engine, site_url, headers, targets, selectors,
+                    known_ids=known_ids if targets[0] in incremental_models else None,
+                    stop_after=stop_after,
+                    page_fanout=config.data.get('page_fanout', 5),
+                    progress=progress
+                )
+                for targets in target_models
+            ))
+
+            update_seen_ids(
+                crawl_state,
+                (ad_id for result in results_list if 'id' in result.columns for ad_id in result['id']),
+                started_at,
+                max_age_days=config.data.get('seen_ids_max_age_days', 30)
+            )
+
+            if progress is not None:
+                for targets, result in zip(target_models, results_list):
+                    ids = result['id'] if 'id' in result.columns else []
+                    progress.new_by_model[targets[0]] = sum(1 for ad_id in ids if ad_id not in known_ids)
+
+            if results_list:
+                dirt_data = pd.concat(results_list, ignore_index=True)
+            else:
+                logging.warning(f"Не знайдено жодних оголошень для моделей: {models}")
+                return None            
+            
+            clean_data = await asyncio.to_thread(cleaner, dirt_data, black_list)
+            if clean_data.empty:
+                logging.warning("Після очищення даних не залишилося жодного оголошення.")
+                return None
+
+            to_fetch = [
+                detail_cache.needs_refresh(ad_id, price, title)
+                for ad_id, price, title in zip(clean_data['id'], clean_data['price'], clean_data['offer_title'])
+            ]
+            stale_data = clean_data[to_fetch]
+            links = list(stale_data['link'])
+
+            logging.info(f"Отримуємо деталі з {len(links)} нових або змінених оголошень "
+                         f"(з кешу: {len(clean_data) - len(links)}).")
+            fetched_df = await get_details(engine, links, headers, selectors, progress)
+
+        listing_info = dict(zip(stale_data['id'], zip(stale_data['price'], stale_data['offer_title'])))
+        for details in fetched_df.to_dict('records'):
+            if details['id'] in listing_info:
+                price, title = listing_info[details['id']]
+                detail_cache.put(details['id'], details, price, title)
+
+        cached_details = [
+            detail_cache.get(ad_id) for ad_id, fetch in zip(clean_data['id'], to_fetch)
+            if not fetch and ad_id in detail_cache
+        ]
+        details_df = pd.concat([fetched_df, pd.DataFrame(cached_details)], ignore_index=True)
+        await asyncio.to_thread(detail_cache.save)
+
+        #категорія визначається щоразу для всіх рядків, включно з деталями з кешу, і за
+        #всіма моделями з config: повторні заголовки бере LRU CategoryMatcher, а стабільний
+        #список моделей не скидає його при скануванні лише частини моделей
+        if not details_df.empty and 'offer_title' in details_df.columns:
+            details_df['category'] = await asyncio.to_thread(
+                category_matcher.categorize, list(details_df['offer_title']), all_models
+            )
 
         clean_data.drop_duplicates(subset=['id'], keep='first', inplace=True)
         details_df.drop_duplicates(subset=['id'], keep='first', inplace=True)
@@ -522,23 +702,93 @@ def run_scraper():
 
         clean_data.reset_index(inplace=True)
 
+        if black_list and config.data.get('spam_check_description', False) and 'description' in clean_data.columns:
+            description_spam = await asyncio.to_thread(detect_spam_batch, clean_data['description'], black_list)
+            previous_spam = clean_data['spam'].fillna(False).astype(bool) if 'spam' in clean_data.columns else False
+            clean_data['spam'] = previous_spam | description_spam
+            logging.info(f"За описом позначено як спам: {int(description_spam.sum())} оголошень.")
+
         laptops = clean_data
 
+        #оголошення, до яких інкрементальне сканування не дійшло, та оголошення
+        #моделей, які цього разу не сканувались, беремо з попередньої бази
+        skipped = set(models) != set(all_models)
+        previous = await asyncio.to_thread(storage.read, LISTINGS) if incremental_models or skipped else pd.DataFrame()
+        if not previous.empty:
+            previous['id'] = previous['id'].astype(str)
+            category = previous['category'].astype(str).str.lower()
+            carried = previous[
+                (category.isin(incremental_models) | (skipped & ~category.isin(models)))
+                & ~previous['id'].isin(laptops['id'])
+            ]
+
+            if not carried.empty:
+                logging.info(f"Перенесено {len(carried)} раніше знайдених оголошень без повторного сканування.")
+                laptops = pd.concat([laptops, carried], ignore_index=True)
+
+        for targets in target_models:
+            if targets[0] not in incremental_models:
+                crawl_state[targets[0]] = started_at
+        await asyncio.to_thread(save_crawl_state, path_crawl_state, crawl_state)
+
         if laptops.empty:
             logging.error(f"При спробі отримати деталі вивникла помилка.",exc_info=True)
-            laptops.to_csv(path_to_save, index=False)
-            return None
-
-        laptops.to_csv(path_to_save, index=False)
+            return laptops
 
-        logging.info(f"Скрапінг успішно завершено. Збережено {len(laptops)} оголошень.")
-        return True
+        host_stats.log()
+        rate_limiter.log()
+        logging.info(f"Скрапінг успішно завершено. Знайдено {len(laptops)} оголошень.")
+        return laptops
 
     except Exception as e:
         logging.error(f"Критична помилка в run_scraper: {e}", exc_info=True)
-        return False    
+        return None
+
+
+def save_listings(config: ConfigManager, laptops: pd.DataFrame):
+
+    """
+    Зберігає результат scrape_listings: основна таблиця та історія цін.
+    """
+
+    get_storage(config).write(LISTINGS, laptops)
+    if not laptops.empty:
+        get_history(config).append(laptops)
+
+
+async def run_scraper_async() -> bool:
+
+    """
+    Головна асинхронна функція. Запускає повний цикл оновлення бази
+    в поточному event loop (наприклад, у циклі бота).
+    """
+
+    config = ConfigManager()
+    laptops = await scrape_listings(config)
+
+    if laptops is None:
+        return False
+
+    await asyncio.to_thread(save_listings, config, laptops)
+    return True if not laptops.empty else None
+
+
+
+
+def run_scraper():
+
+    """
+    Головна функція (Entry Point). Синхронна обгортка над run_scraper_async
+    для запуску скрапера поза event loop (наприклад, з консолі).
+    """
+
+    return asyncio.run(run_scraper_async())
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
     run_scraper()
-    pass
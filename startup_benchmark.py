@@ -0,0 +1,184 @@
+"""
+Бенчмарк старту бота: час імпорту кожного модуля та час до першого
+запиту polling (time-to-first-poll) у чистому процесі Python.
+
+Запуск:
+    python startup_benchmark.py            # звіт
+    python startup_benchmark.py --strict   # код виходу 1, якщо бюджет перевищено
+
+Кожен вимір робиться в окремому підпроцесі, тож кеш імпортів не впливає
+на результат; береться медіана з кількох повторів.
+
+Окремо міряється власна вага проєкту: у підпроцесі спершу імпортується
+aiogram (BASELINE), і лише після цього вмикається таймер. Так тривалий
+та нестабільний імпорт aiogram не ховає регресії в модулях бота — ці
+бюджети (OVERHEAD_BUDGETS) перевіряє tests/test_startup.py.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent
+
+#бюджети в секундах (aiogram сам по собі імпортується довго, тож бюджети
+#для модулів бота рахуються з запасом на нього)
+IMPORT_BUDGETS = {
+    "config_manager": 0.05,
+    "LaptopBase": 0.1,
+    "persistence": 0.1,
+    "storage": 1.0,
+    "analysis_engine": 1.5,
+    "scraper": 3.0,
+    "tg_bot": 6.0,
+    "main": 6.0,
+}
+FIRST_POLL_BUDGET = 6.0
+
+#базовий імпорт, час якого віднімається з вимірів власних модулів
+BASELINE = "aiogram"
+
+#бюджети в секундах понад BASELINE: модулі бота не мають тягнути нічого важкого
+OVERHEAD_BUDGETS = {
+    "tg_bot": 0.15,
+    "main": 0.15,
+}
+FIRST_POLL_OVERHEAD_BUDGET = 0.25
+
+#модулі, яких не має бути в пам'яті на момент першого polling
+DEFERRED_MODULES = ("pandas", "numpy", "pyarrow", "bs4", "rapidfuzz", "selectolax", "fake_headers", "scraper")
+
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+{preload}
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_POLL_SNIPPET = """
+import sys, time, json, asyncio
+sys.path.insert(0, {root!r})
+{preload}
+start = time.perf_counter()
+
+import main
+
+class _Me:
+    username = "benchmark"
+
+class _Session:
+    async def close(self):
+        pass
+
+class _Bot:
+    def __init__(self, token):
+        self.session = _Session()
+    async def get_me(self):
+        return _Me()
+    async def delete_webhook(self, **kwargs):
+        pass
+
+result = {{}}
+
+async def _start_polling(bot, **kwargs):
+    result["first_poll"] = time.perf_counter() - start
+    result["loaded"] = [name for name in {deferred!r} if name in sys.modules]
+
+async def _no_scraping(*args, **kwargs):
+    pass
+
+config = main.ConfigManager()
+config.data["token"] = "benchmark"
+
+main.Bot = _Bot
+main.ConfigManager = lambda: config
+main.scheduled_scraping = _no_scraping
+main.dp.start_polling = _start_polling
+
+asyncio.run(main.main())
+print(json.dumps(result))
+"""
+
+
+def _run(code: str) -> str:
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return completed.stdout.strip().splitlines()[-1]
+
+
+def _preload(baseline: bool) -> str:
+    return f"import {BASELINE}" if baseline else ""
+
+
+def measure_import(module: str, repeat: int, baseline: bool = False) -> float:
+    snippet = IMPORT_SNIPPET.format(root=str(ROOT), module=module, preload=_preload(baseline))
+    return statistics.median(float(_run(snippet)) for _ in range(repeat))
+
+
+def measure_imports(repeat: int) -> dict:
+    return {module: measure_import(module, repeat) for module in IMPORT_BUDGETS}
+
+
+def measure_first_poll(repeat: int, baseline: bool = False) -> tuple[float, list]:
+    snippet = FIRST_POLL_SNIPPET.format(root=str(ROOT), deferred=DEFERRED_MODULES, preload=_preload(baseline))
+    runs = [json.loads(_run(snippet)) for _ in range(repeat)]
+    loaded = sorted({name for run in runs for name in run.get("loaded", [])})
+    return statistics.median(run.get("first_poll", float("inf")) for run in runs), loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="кількість повторів кожного виміру")
+    parser.add_argument("--strict", action="store_true", help="завершитись з кодом 1 при перевищенні бюджету")
+    args = parser.parse_args()
+
+    failures = []
+
+    print(f"{'модуль':<18}{'імпорт, с':>12}{'бюджет, с':>12}")
+    for module, seconds in measure_imports(args.repeat).items():
+        budget = IMPORT_BUDGETS[module]
+        mark = "" if seconds <= budget else "  <-- понад бюджет"
+        print(f"{module:<18}{seconds:>12.3f}{budget:>12.2f}{mark}")
+        if mark:
+            failures.append(f"імпорт {module}: {seconds:.3f} с > {budget} с")
+
+    first_poll, loaded = measure_first_poll(args.repeat)
+    print(f"\ntime-to-first-poll: {first_poll:.3f} с (бюджет {FIRST_POLL_BUDGET} с)")
+    if first_poll > FIRST_POLL_BUDGET:
+        failures.append(f"time-to-first-poll: {first_poll:.3f} с > {FIRST_POLL_BUDGET} с")
+
+    print(f"\n{'понад ' + BASELINE:<18}{'імпорт, с':>12}{'бюджет, с':>12}")
+    for module, budget in OVERHEAD_BUDGETS.items():
+        seconds = measure_import(module, args.repeat, baseline=True)
+        mark = "" if seconds <= budget else "  <-- понад бюджет"
+        print(f"{module:<18}{seconds:>12.3f}{budget:>12.2f}{mark}")
+        if mark:
+            failures.append(f"імпорт {module} понад {BASELINE}: {seconds:.3f} с > {budget} с")
+
+    overhead, _ = measure_first_poll(args.repeat, baseline=True)
+    print(f"time-to-first-poll понад {BASELINE}: {overhead:.3f} с (бюджет {FIRST_POLL_OVERHEAD_BUDGET} с)")
+    if overhead > FIRST_POLL_OVERHEAD_BUDGET:
+        failures.append(f"time-to-first-poll понад {BASELINE}: {overhead:.3f} с > {FIRST_POLL_OVERHEAD_BUDGET} с")
+
+    if loaded:
+        print(f"Завантажено до першого polling: {', '.join(loaded)}")
+        failures.append(f"важкі модулі до першого polling: {', '.join(loaded)}")
+
+    if failures:
+        print("\nПеревищено бюджет:\n  " + "\n  ".join(failures))
+        return 1 if args.strict else 0
+
+    print("\nУсі бюджети дотримано.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,446 @@
+import os
+import sqlite3
+import importlib.util
+import logging
+import pandas as pd
+import numpy as np
+from contextlib import closing
+from pathlib import Path
+
+#сам pyarrow імпортується лише при першому читанні/записі parquet
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+#назви таблиць, з якими працює проєкт
+LISTINGS = "listings"
+HOT_DEALS = "hot_deals"
+
+#колонки, які зберігаються як булеві значення
+BOOL_COLUMNS = {"spam", "is_new"}
+
+#явна схема колонок: однакові типи незалежно від того, звідки прочитано дані
+SCHEMA = {
+    "id": "str",
+    "price": "Int64",
+    "ram": "Int64",
+    "disk_v": "Int64",
+    "count": "Int64",
+    "median": "float64",
+    "deal_score": "float64",
+    "category": "category",
+    "place": "category",
+    "cpu": "category",
+    "gpu": "category",
+    "spam": "bool",
+    "is_new": "bool",
+}
+
+#колонки, яких достатньо для розрахунку ринкової статистики
+ANALYSIS_COLUMNS = ["id", "category", "ram", "disk_v", "price", "spam"]
+
+
+def _to_python(value):
+
+    """
+    Перетворює значення з DataFrame у тип, який розуміє sqlite3.
+    """
+
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+
+    """
+    Приводить відомі колонки до типів зі SCHEMA. Невідомі колонки не змінюються.
+    """
+
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+
+        try:
+            if dtype == "bool":
+                values = df[col].replace({"True": True, "False": False, "true": True, "false": False})
+                df[col] = values.fillna(False).astype(bool)
+            elif dtype == "Int64":
+                df[col] = pd.to_numeric(df[col], errors='coerce').round().astype("Int64")
+            elif dtype == "str":
+                df[col] = df[col].astype(str)
+            else:
+                df[col] = df[col].astype(dtype)
+        except Exception as e:
+            logging.warning(f"Не вдалося привести колонку {col} до {dtype}: {e}")
+
+    return df
+
+
+def _select(df: pd.DataFrame, columns: list = None, ids=None) -> pd.DataFrame:
+    if ids is not None and 'id' in df.columns:
+        df = df[df['id'].astype(str).isin({str(ad_id) for ad_id in ids})]
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df.reset_index(drop=True)
+
+
+class CsvStorage:
+
+    """
+    Сховище на CSV-файлах (поведінка за замовчуванням): одна таблиця — один файл.
+    Будь-яка зміна переписує файл повністю.
+    """
+
+    supports_row_updates = False
+
+    def __init__(self, paths: dict):
+        self.paths = {table: Path(path) for table, path in paths.items()}
+
+    def read(self, table: str, columns: list = None, ids=None) -> pd.DataFrame:
+
+        """
+        Читає таблицю. columns — лише потрібні колонки, ids — лише потрібні рядки.
+        """
+
+        path = self.paths[table]
+
+        if not path.exists():
+            return pd.DataFrame()
+        try:
+            usecols = (lambda col: col in columns) if columns is not None else None
+            return apply_schema(_select(pd.read_csv(path, usecols=usecols), columns, ids))
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати {path}: {e}")
+            return pd.DataFrame()
+
+    def version(self, table: str):
+
+        """
+        Ознака версії таблиці: змінюється при кожному записі (для файлів — mtime та розмір).
+        """
+
+        try:
+            stat = self.paths[table].stat()
+            return stat.st_mtime_ns, stat.st_size
+        except (KeyError, OSError):
+            return None
+
+    def write(self, table: str, df: pd.DataFrame):
+        path = self.paths[table]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(path, index=False)
+
+    def upsert(self, table: str, df: pd.DataFrame):
+        current = self.read(table)
+
+        if current.empty or 'id' not in current.columns:
+            self.write(table, df)
+            return
+
+        current['id'] = current['id'].astype(str)
+        df = df.assign(id=df['id'].astype(str))
+        merged = pd.concat([df, current[~current['id'].isin(df['id'])]], ignore_index=True)
+        self.write(table, merged)
+
+    def set_value(self, table: str, ad_id: str, column: str, value, df: pd.DataFrame = None):
+
+        """
+        CSV не вміє оновлювати один рядок, тому файл переписується з df
+        (поточного стану в пам'яті) або з прочитаної таблиці.
+        """
+
+        if df is None:
+            df = self.read(table)
+            if df.empty:
+                return
+            df.loc[df['id'].astype(str) == str(ad_id), column] = value
+
+        self.write(table, df)
+
+
+class ParquetStorage(CsvStorage):
+
+    """
+    Типізовані колонкові знімки таблиць у форматі Parquet (pyarrow).
+
+    Типи зі SCHEMA зберігаються у файлі, тож при читанні нічого не треба
+    вгадувати, а read(columns=...) читає з диска лише потрібні колонки.
+    Якщо знімка ще немає, дані один раз читаються з CSV-файлу legacy_paths.
+    """
+
+    def __init__(self, paths: dict, legacy_paths: dict = None):
+        super().__init__(paths)
+        self.legacy = CsvStorage(legacy_paths) if legacy_paths else None
+
+    def read(self, table: str, columns: list = None, ids=None) -> pd.DataFrame:
+        path = self.paths[table]
+
+        if not path.exists():
+            if self.legacy is not None and table in self.legacy.paths:
+                return self.legacy.read(table, columns, ids)
+            return pd.DataFrame()
+
+        try:
+            filters = [('id', 'in', [str(ad_id) for ad_id in ids])] if ids is not None else None
+
+            if columns is not None:
+                import pyarrow.parquet as pq
+                available = set(pq.read_schema(path).names)
+                columns = [col for col in columns if col in available]
+
+            df = pd.read_parquet(path, columns=columns, filters=filters)
+            return apply_schema(df.reset_index(drop=True))
+
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати {path}: {e}")
+            return pd.DataFrame()
+
+    def version(self, table: str):
+        if not self.paths[table].exists() and self.legacy is not None and table in self.legacy.paths:
+            return self.legacy.version(table)
+        return super().version(table)
+
+    def write(self, table: str, df: pd.DataFrame):
+        path = self.paths[table]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+
+        df = apply_schema(df.reset_index(drop=True).copy())
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+class SqliteStorage:
+
+    """
+    Сховище на SQLite (stdlib, без сервера). Кожна таблиця має первинний
+    ключ id (він же індекс), запис виконується як upsert, а зміна
+    прапорців spam/is_new — як UPDATE одного рядка.
+
+    Колонки таблиць створюються за колонками DataFrame при першому записі
+    та додаються через ALTER TABLE, якщо з'являються нові.
+    """
+
+    supports_row_updates = True
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS _versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _sql_type(column: str, dtype) -> str:
+        if column in BOOL_COLUMNS or pd.api.types.is_bool_dtype(dtype):
+            return "BOOLEAN"
+        if pd.api.types.is_integer_dtype(dtype):
+            return "INTEGER"
+        if pd.api.types.is_float_dtype(dtype):
+            return "REAL"
+        return "TEXT"
+
+    def _columns(self, conn: sqlite3.Connection, table: str) -> dict:
+        return {row[1]: row[2] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+    def _ensure_table(self, conn: sqlite3.Connection, table: str, df: pd.DataFrame):
+        existing = self._columns(conn, table)
+
+        if not existing:
+            columns = ['"id" TEXT PRIMARY KEY'] + [
+                f'"{col}" {self._sql_type(col, df[col].dtype)}' for col in df.columns if col != 'id'
+            ]
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(columns)})')
+            return
+
+        for col in df.columns:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}" {self._sql_type(col, df[col].dtype)}')
+
+    def read(self, table: str, columns: list = None, ids=None) -> pd.DataFrame:
+        try:
+            with closing(self._connect()) as conn:
+                existing = self._columns(conn, table)
+                if not existing:
+                    return pd.DataFrame()
+
+                selected = [col for col in (columns or existing) if col in existing]
+                names = ", ".join(f'"{col}"' for col in selected)
+                sql = f'SELECT {names} FROM "{table}"'
+
+                if ids is not None:
+                    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _read_ids (id TEXT PRIMARY KEY)")
+                    conn.execute("DELETE FROM _read_ids")
+                    conn.executemany("INSERT OR IGNORE INTO _read_ids (id) VALUES (?)", ((str(ad_id),) for ad_id in ids))
+                    sql += ' WHERE "id" IN (SELECT id FROM _read_ids)'
+
+                df = pd.read_sql_query(sql, conn)
+
+            for col in df.columns:
+                if existing[col] == "BOOLEAN":
+                    df[col] = df[col].fillna(0).astype(bool)
+
+            return apply_schema(df)
+
+        except Exception as e:
+            logging.error(f"Не вдалося прочитати таблицю {table} з {self.path}: {e}")
+            return pd.DataFrame()
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, table: str):
+        conn.execute(
+            "INSERT INTO _versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1", (table,)
+        )
+
+    def version(self, table: str):
+
+        """
+        Лічильник змін таблиці, який збільшується в тій самій транзакції, що й запис.
+        """
+
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute("SELECT version FROM _versions WHERE name = ?", (table,)).fetchone()
+            return row[0] if row else 0
+        except Exception:
+            return None
+
+    def _upsert(self, conn: sqlite3.Connection, table: str, df: pd.DataFrame):
+        self._ensure_table(conn, table, df)
+
+        columns = list(df.columns)
+        names = ", ".join(f'"{col}"' for col in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        updates = ", ".join(f'"{col}" = excluded."{col}"' for col in columns if col != 'id')
+
+        sql = f'INSERT INTO "{table}" ({names}) VALUES ({placeholders}) ON CONFLICT("id") DO '
+        sql += f'UPDATE SET {updates}' if updates else 'NOTHING'
+
+        rows = ([_to_python(value) for value in row] for row in df.itertuples(index=False, name=None))
+        conn.executemany(sql, rows)
+        self._bump(conn, table)
+
+    @staticmethod
+    def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.assign(id=df['id'].astype(str))
+        return df.drop_duplicates(subset=['id'], keep='first')
+
+    def upsert(self, table: str, df: pd.DataFrame):
+
+        """
+        Додає нові та оновлює існуючі рядки за id, не чіпаючи решту таблиці.
+        """
+
+        if df.empty or 'id' not in df.columns:
+            return
+
+        with closing(self._connect()) as conn, conn:
+            self._upsert(conn, table, self._prepare(df))
+
+    def write(self, table: str, df: pd.DataFrame):
+
+        """
+        Замінює вміст таблиці на df: upsert усіх рядків та видалення
+        лише тих id, яких у df більше немає.
+        """
+
+        with closing(self._connect()) as conn, conn:
+            if df.empty or 'id' not in df.columns:
+                if self._columns(conn, table):
+                    conn.execute(f'DELETE FROM "{table}"')
+                    self._bump(conn, table)
+                return
+
+            df = self._prepare(df)
+            self._upsert(conn, table, df)
+
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS _keep_ids (id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM _keep_ids")
+            conn.executemany("INSERT INTO _keep_ids (id) VALUES (?)", ((ad_id,) for ad_id in df['id']))
+            conn.execute(f'DELETE FROM "{table}" WHERE "id" NOT IN (SELECT id FROM _keep_ids)')
+
+    def set_value(self, table: str, ad_id: str, column: str, value, df: pd.DataFrame = None):
+
+        """
+        Оновлює одне поле одного рядка (наприклад, spam або is_new).
+        """
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                if column not in self._columns(conn, table):
+                    return
+                conn.execute(f'UPDATE "{table}" SET "{column}" = ? WHERE "id" = ?', (_to_python(value), str(ad_id)))
+                self._bump(conn, table)
+        except Exception as e:
+            logging.error(f"Не вдалося оновити {column} для {ad_id} у {table}: {e}")
+
+
+def get_storage(config) -> CsvStorage | ParquetStorage | SqliteStorage:
+
+    """
+    Створює сховище за налаштуванням storage_backend ('parquet', 'csv' або 'sqlite').
+    Parquet-знімки лежать поруч із CSV-файлами (path_data, path_hot_deals)
+    з розширенням .parquet; без pyarrow використовується CSV.
+    """
+
+    backend = config.data.get('storage_backend', 'parquet')
+
+    if backend == 'sqlite':
+        return SqliteStorage(config.data.get('path_db', 'data/laptops.db'))
+
+    csv_paths = {
+        LISTINGS: config.data.get('path_data', 'data/laptops.csv'),
+        HOT_DEALS: config.data.get('path_hot_deals', 'data/hot_deals.csv')
+    }
+
+    if backend == 'parquet':
+        if PARQUET_AVAILABLE:
+            paths = {table: Path(path).with_suffix('.parquet') for table, path in csv_paths.items()}
+            return ParquetStorage(paths, legacy_paths=csv_paths)
+        logging.warning("pyarrow не встановлено, використовуємо csv.")
+
+    elif backend != 'csv':
+        logging.warning(f"Невідомий storage_backend '{backend}', використовуємо csv.")
+
+    return CsvStorage(csv_paths)
+
+
+def import_csv(config) -> dict:
+
+    """
+    Одноразовий перенос laptops.csv та hot_deals.csv у SQLite-базу path_db.
+
+    Returns:
+        dict: Кількість перенесених рядків для кожної таблиці.
+    """
+
+    source = CsvStorage({
+        LISTINGS: config.data.get('path_data', 'data/laptops.csv'),
+        HOT_DEALS: config.data.get('path_hot_deals', 'data/hot_deals.csv')
+    })
+    target = SqliteStorage(config.data.get('path_db', 'data/laptops.db'))
+
+    imported = {}
+    for table in (LISTINGS, HOT_DEALS):
+        df = source.read(table)
+        target.write(table, df)
+        imported[table] = len(df)
+        logging.info(f"Таблицю {table} перенесено в {target.path}: {len(df)} рядків.")
+
+    return imported
+
+
+if __name__ == "__main__":
+    from config_manager import ConfigManager
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+    import_csv(ConfigManager())
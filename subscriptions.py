@@ -0,0 +1,239 @@
+import shlex
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
+import numpy as np
+
+
+#кошик для підписок без обмеження за моделями
+ANY_CATEGORY = "*"
+
+
+@dataclass
+class SubscriptionFilter:
+
+    categories: list = field(default_factory=list)
+    max_price: float = None
+    min_ram: int = None
+    min_disk: int = None
+    min_score: float = None
+    max_score: float = None
+    exclude: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SubscriptionFilter":
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in (data or {}).items() if key in known})
+
+    def to_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if getattr(self, f.name) not in (None, [])}
+
+    def describe(self) -> str:
+        lines = [
+            f"Моделі: {', '.join(self.categories) if self.categories else 'всі'}",
+            f"Максимальна ціна: {self.max_price if self.max_price is not None else '—'}",
+            f"Мінімум RAM: {self.min_ram if self.min_ram is not None else '—'}",
+            f"Мінімум диска: {self.min_disk if self.min_disk is not None else '—'}",
+            f"Deal Score: {self.min_score if self.min_score is not None else 0} — {self.max_score if self.max_score is not None else 1}",
+            f"Виключити слова: {', '.join(self.exclude) if self.exclude else '—'}",
+        ]
+        return "\n".join(lines)
+
+
+#ключ команди /filter -> (поле фільтра, перетворення значення)
+FILTER_ARGS = {
+    "models": ("categories", lambda value: [item.strip().lower() for item in value.split(",") if item.strip()]),
+    "max_price": ("max_price", float),
+    "min_ram": ("min_ram", int),
+    "min_disk": ("min_disk", int),
+    "min_score": ("min_score", float),
+    "max_score": ("max_score", float),
+    "exclude": ("exclude", lambda value: [item.strip().lower() for item in value.split(",") if item.strip()]),
+}
+
+
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "«": '"', "»": '"'})
+
+
+def resolve_models(names: list, models) -> list:
+
+    """
+    Зводить назви моделей з /filter до моделей з config['models']: назва
+    відповідає кожній моделі, що її містить ("macbook" -> "macbook pro m2",
+    "macbook air"). Категорії оголошень — саме ці повні назви.
+
+    Raises:
+        ValueError: Назва не відповідає жодній моделі.
+    """
+
+    configured = [str(model).lower() for model in models]
+    resolved = []
+
+    for name in names:
+        found = [model for model in configured if name in model]
+        if not found:
+            available = ", ".join(sorted(configured)) or "—"
+            raise ValueError(f"Модель '{name}' не відстежується. Доступні моделі: {available}")
+        resolved.extend(model for model in found if model not in resolved)
+
+    return resolved
+
+
+def parse_filter_args(text: str, current: dict = None, models=None) -> dict:
+
+    """
+    Розбирає аргументи команди /filter у вигляді key=value через пробіл
+    (наприклад, 'models="macbook pro",thinkpad max_price=4000 min_ram=16')
+    і накладає їх на поточні налаштування. Значення "-" знімає обмеження.
+    Якщо задано models (config['models']), назви моделей зводяться до них
+    (див. resolve_models).
+
+    Raises:
+        ValueError: Невідомий ключ, модель або некоректне значення.
+    """
+
+    settings = dict(current or {})
+
+    #Telegram на мобільних замінює лапки на типографські
+    text = text.translate(SMART_QUOTES)
+    try:
+        pairs = shlex.split(text)
+    except ValueError:
+        raise ValueError("Не закрито лапки в назві моделі")
+
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or key not in FILTER_ARGS:
+            raise ValueError(f"Невідомий параметр: {pair}")
+
+        name, convert = FILTER_ARGS[key]
+        if value == "-":
+            settings.pop(name, None)
+        else:
+            settings[name] = convert(value)
+            if name == "categories" and models is not None:
+                settings[name] = resolve_models(settings[name], models)
+
+    return SubscriptionFilter.from_dict(settings).to_dict()
+
+
+class _Bucket:
+
+    """
+    Підписки однієї категорії, відсортовані за max_price, з масивами решти
+    меж. Ціна відсікає префікс бінарним пошуком, інші межі перевіряються
+    векторно лише на залишку.
+    """
+
+    def __init__(self, members: list, filters: list):
+        members = sorted(members, key=lambda i: _bound(filters[i].max_price, np.inf))
+
+        self.members = np.array(members, dtype=np.int64)
+        self.max_price = np.array([_bound(filters[i].max_price, np.inf) for i in members], dtype=float)
+        self.min_ram = np.array([_bound(filters[i].min_ram, -np.inf) for i in members], dtype=float)
+        self.min_disk = np.array([_bound(filters[i].min_disk, -np.inf) for i in members], dtype=float)
+        self.min_score = np.array([_bound(filters[i].min_score, -np.inf) for i in members], dtype=float)
+        self.max_score = np.array([_bound(filters[i].max_score, np.inf) for i in members], dtype=float)
+
+    def match(self, price: float, ram: float, disk: float, score: float) -> np.ndarray:
+        start = int(self.max_price.searchsorted(price, side='left'))
+        if start >= len(self.members):
+            return self.members[:0]
+
+        mask = (
+            (self.min_ram[start:] <= ram)
+            & (self.min_disk[start:] <= disk)
+            & (self.min_score[start:] <= score)
+            & (self.max_score[start:] >= score)
+        )
+        return self.members[start:][mask]
+
+
+def _bound(value, default: float) -> float:
+    return default if value is None else float(value)
+
+
+def _number(value, default: float = 0.0) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if value != value else value
+
+
+class SubscriptionIndex:
+
+    """
+    Інвертований індекс підписок: категорія -> кошик підписок з відсортованими
+    межами ціни (див. _Bucket). Оголошення порівнюється лише з підписками
+    своєї категорії та з підписками без обмеження за моделями, а слова-винятки
+    перевіряються тільки для тих, хто пройшов числові межі.
+    """
+
+    def __init__(self, filters: dict):
+        self.chat_ids = list(filters)
+        filters = list(filters.values())
+
+        self.excludes = {i: f.exclude for i, f in enumerate(filters) if f.exclude}
+
+        members = defaultdict(list)
+        for i, f in enumerate(filters):
+            for category in (f.categories or [ANY_CATEGORY]):
+                members[str(category).lower()].append(i)
+
+        self.buckets = {category: _Bucket(items, filters) for category, items in members.items()}
+
+    @classmethod
+    def from_registry(cls, registry) -> "SubscriptionIndex":
+        return cls({chat_id: SubscriptionFilter.from_dict(registry.settings(chat_id)) for chat_id in registry.chat_ids()})
+
+    def match(self, category, price, ram, disk, score, title: str = "") -> list:
+
+        """
+        Повертає chat_id підписок, яким підходить оголошення.
+        """
+
+        price, ram, disk, score = _number(price), _number(ram), _number(disk), _number(score)
+
+        found = []
+        for key in {str(category).lower(), ANY_CATEGORY}:
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                found.append(bucket.match(price, ram, disk, score))
+
+        if not found:
+            return []
+
+        matched = np.unique(np.concatenate(found))
+
+        if self.excludes:
+            title = str(title).lower()
+            matched = [
+                i for i in matched.tolist()
+                if not any(word in title for word in self.excludes.get(i, ()))
+            ]
+        else:
+            matched = matched.tolist()
+
+        return [self.chat_ids[i] for i in matched]
+
+    def match_frame(self, df) -> dict:
+
+        """
+        Розподіляє рядки таблиці гарячих пропозицій між підписками.
+
+        Returns:
+            dict: chat_id -> список позицій рядків, що йому підходять.
+        """
+
+        matches = defaultdict(list)
+        if df.empty:
+            return matches
+
+        columns = [df[col].to_numpy() if col in df.columns else np.full(len(df), None)
+                   for col in ('category', 'price', 'ram', 'disk_v', 'deal_score', 'offer_title')]
+
+        for position, row in enumerate(zip(*columns)):
+            for chat_id in self.match(*row):
+                matches[chat_id].append(position)
+
+        return matches
@@ -0,0 +1,126 @@
+import asyncio
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+import html_parser
+import scraper
+
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+SELECTORS = json.loads((ROOT / "config_example.json").read_text(encoding="utf-8"))["selectors"]
+
+#селектори з різними назвами атрибутів: _strainer не може їх поєднати і повертає None
+MIXED_SELECTORS = copy.deepcopy(SELECTORS)
+MIXED_SELECTORS["pagination"] = {"class": "pagination-list"}
+MIXED_SELECTORS["image_url"] = {"class": "swiper-image"}
+
+SEARCH_URL = "https://www.olx.pl/elektronika/komputery/laptopy/q-"
+
+AVAILABLE = {
+    "html.parser": True,
+    "lxml": html_parser.LXML_AVAILABLE,
+    "selectolax": html_parser.LexborHTMLParser is not None,
+}
+
+
+def fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class FixtureEngine:
+
+    """
+    Замінник CrawlEngine, що віддає сторінки каталогу з tests/fixtures.
+    """
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+
+    async def fetch(self, link: str, headers=None):
+        page = int(link.rsplit("page=", 1)[1])
+        html = self.pages.get(page)
+        return (html, link) if html is not None else (None, None)
+
+
+def scrape_catalog(selectors: dict) -> list:
+    engine = FixtureEngine({1: fixture("listing_page_1.html"), 2: fixture("listing_page_2.html")})
+    df = asyncio.run(scraper.target_scrap_OLX(engine, SEARCH_URL, [], ["macbook"], selectors, page_fanout=2))
+    return df.to_dict("records")
+
+
+def parse_adverts(selectors: dict) -> list:
+    return [
+        scraper.parse_advert(fixture(name), f"https://www.olx.pl/d/oferta/{slug}.html", selectors).to_dict()
+        for name, slug in [("advert.html", "dell-xps-13-9310-CID99-IDdx103"),
+                           ("advert_minimal.html", "lenovo-thinkpad-x1-CID99-IDx1c5")]
+    ]
+
+
+def parse_all(selectors: dict) -> dict:
+    return {
+        "catalog": scrape_catalog(selectors),
+        "page_count": scraper.parse_page_count(fixture("listing_page_1.html"), selectors, 5),
+        "adverts": parse_adverts(selectors),
+    }
+
+
+@pytest.fixture
+def backend():
+    previous = html_parser.get_backend()
+    yield html_parser.configure
+    html_parser.configure(previous)
+
+
+@pytest.fixture
+def reference(backend, monkeypatch):
+
+    """
+    Результат html.parser на повному дереві (без SoupStrainer) — еталон для всіх бекендів.
+    """
+
+    def build(selectors: dict) -> dict:
+        with monkeypatch.context() as patch:
+            patch.setattr(html_parser, "_strainer", lambda selectors, keys: None)
+            backend("html.parser")
+            return parse_all(selectors)
+
+    return build
+
+
+def test_reference_values(reference):
+    result = reference(SELECTORS)
+
+    ids = [row["id"] for row in result["catalog"]]
+    assert ids == ["mbp101", "tp102", "dx103", "as104", "ma201", "hp202", "lg204"]
+    assert result["catalog"][0]["offer_title"] == "MacBook Pro M2 & etui16/512"
+    assert result["page_count"] == 2
+
+    advert, minimal = result["adverts"]
+    assert (advert["ram"], advert["disk_v"], advert["cpu"]) == (16, 1000, "Intel Core i7 1165 G7")
+    assert advert["image_link"].startswith("https://ireland.apollo.olxcdn.com/v1/files/abc123/")
+    assert "track(" not in advert["description"]
+    assert (minimal["ram"], minimal["disk_v"], minimal["cpu"]) == (0, 0, "")
+
+
+@pytest.mark.parametrize("name", html_parser.BACKENDS)
+@pytest.mark.parametrize("selectors", [SELECTORS, MIXED_SELECTORS], ids=["data-testid", "mixed-attrs"])
+def test_backend_parity(name, selectors, backend, reference):
+    if not AVAILABLE[name]:
+        pytest.skip(f"{name} не встановлено")
+
+    expected = reference(selectors)
+
+    assert backend(name) == name
+    assert parse_all(selectors) == expected
+
+
+def test_strainer_fallback():
+    keys = ["pagination", "total_count"]
+
+    assert html_parser._strainer(SELECTORS, keys) is not None
+    assert html_parser._strainer(MIXED_SELECTORS, keys) is None
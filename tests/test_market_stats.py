@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_stats import MarketStats, GROUP_COLS
+
+
+DAY = 86400
+CATEGORIES = ["macbook", "thinkpad", "xps"]
+
+
+def make_listing(rng, ids) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": [str(i) for i in ids],
+        "category": rng.choice(CATEGORIES, len(ids)),
+        "ram": rng.choice([8, 16, 32], len(ids)),
+        "disk_v": rng.choice([256, 512], len(ids)),
+        "price": rng.integers(1000, 9000, len(ids)),
+    })
+
+
+def mutate(rng, listing: pd.DataFrame) -> pd.DataFrame:
+
+    """
+    Наступне сканування: частина оголошень зникає, частина з'являється,
+    частина змінює ціну або групу.
+    """
+
+    listing = listing[rng.random(len(listing)) > 0.15].copy()
+    start = int(listing["id"].astype(int).max()) + 1 if len(listing) else 0
+    listing = pd.concat([listing, make_listing(rng, range(start, start + rng.integers(5, 40)))], ignore_index=True)
+
+    repriced = rng.random(len(listing)) < 0.2
+    listing.loc[repriced, "price"] = rng.integers(1000, 9000, repriced.sum())
+    moved = rng.random(len(listing)) < 0.1
+    listing.loc[moved, "category"] = rng.choice(CATEGORIES, moved.sum())
+    listing.loc[moved, "ram"] = rng.choice([8, 16, 32], moved.sum())
+    return listing
+
+
+def expected_stats(market: dict) -> pd.DataFrame:
+    frame = pd.DataFrame(list(market.values()), columns=GROUP_COLS + ["price", "seen"])
+    return frame.groupby(GROUP_COLS)["price"].agg(["median", "count"])
+
+
+def actual_stats(stats: MarketStats) -> pd.DataFrame:
+    frame = stats.frame().astype({"ram": "int64", "disk_v": "int64", "count": "int64"})
+    return frame.set_index(GROUP_COLS).sort_index()[["median", "count"]]
+
+
+def assert_matches(stats: MarketStats, market: dict, ids):
+    expected = expected_stats(market)
+    actual = actual_stats(stats)
+
+    assert list(actual.index) == list(expected.index)
+    np.testing.assert_array_equal(actual["median"].to_numpy(), expected["median"].to_numpy(dtype="float64"))
+    np.testing.assert_array_equal(actual["count"].to_numpy(), expected["count"].to_numpy())
+
+    median, count = stats.lookup(ids)
+    for id_, group_median, group_count in zip(ids, median, count):
+        if id_ in market:
+            group = expected.loc[tuple(market[id_][:3])]
+            assert (group_median, group_count) == (group["median"], group["count"])
+        else:
+            assert np.isnan(group_median) and group_count == 0
+
+
+@pytest.mark.parametrize("window_days", [0, 2])
+def test_update_matches_groupby(tmp_path, window_days):
+    rng = np.random.default_rng(window_days)
+    stats = MarketStats(tmp_path / "market_stats.json")
+    listing = make_listing(rng, range(200))
+    #еталонний ринковий набір: id -> (category, ram, disk_v, price, seen)
+    market = {}
+
+    for round_no in range(8):
+        now = 1_000_000 + round_no * DAY
+        if round_no:
+            listing = mutate(rng, listing)
+        excluded = set(rng.choice(listing["id"], 5, replace=False))
+
+        stats.update(listing[~listing["id"].isin(excluded)], excluded, window_days, now)
+
+        for row in listing.itertuples(index=False):
+            market[row.id] = (row.category, row.ram, row.disk_v, row.price, now)
+        market = {
+            id_: values for id_, values in market.items()
+            if id_ not in excluded and values[4] >= now - window_days * DAY
+        }
+
+        assert_matches(stats, market, list(listing["id"]) + ["missing"])
+
+    restored = MarketStats(tmp_path / "market_stats.json")
+    assert restored.empty
+
+    stats.save()
+    restored = MarketStats(tmp_path / "market_stats.json")
+    assert_matches(restored, market, list(market) + ["missing"])
@@ -0,0 +1,15 @@
+import numpy as np
+
+import matching_benchmark as bench
+from matching import detect_spam_batch
+from scraper import clean_prices
+
+
+def test_batch_matches_per_row_reference():
+    listing = bench.make_listing(2000, seed=1)
+
+    for column in ("offer_title", "description"):
+        expected = bench._reference_spam(list(listing[column]), bench.BLACK_LIST)
+        assert np.array_equal(detect_spam_batch(listing[column], bench.BLACK_LIST), expected)
+
+    assert clean_prices(listing["price"]).equals(bench._reference_prices(listing["price"]))
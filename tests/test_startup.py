@@ -0,0 +1,24 @@
+import pytest
+
+import startup_benchmark as bench
+
+
+#медіана з кількох чистих процесів згладжує шум планувальника ОС
+REPEAT = 3
+
+
+@pytest.mark.parametrize("module", sorted(bench.OVERHEAD_BUDGETS))
+def test_import_overhead(module):
+    seconds = bench.measure_import(module, REPEAT, baseline=True)
+    budget = bench.OVERHEAD_BUDGETS[module]
+
+    assert seconds <= budget, f"імпорт {module} понад {bench.BASELINE}: {seconds:.3f} с > {budget} с"
+
+
+def test_first_poll_overhead():
+    seconds, loaded = bench.measure_first_poll(REPEAT, baseline=True)
+
+    assert not loaded, f"важкі модулі до першого polling: {', '.join(loaded)}"
+    assert seconds <= bench.FIRST_POLL_OVERHEAD_BUDGET, (
+        f"time-to-first-poll понад {bench.BASELINE}: {seconds:.3f} с > {bench.FIRST_POLL_OVERHEAD_BUDGET} с"
+    )
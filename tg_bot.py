@@ -1,4 +1,5 @@
 import asyncio
+from html import escape
 from aiogram import Bot, Dispatcher, types, F  
 from aiogram.filters import CommandStart, Command
 from aiogram.utils.keyboard import InlineKeyboardBuilder
@@ -7,6 +8,10 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 from config_manager import ConfigManager
 from LaptopBase import LaptopBase
+from persistence import PersistenceSink
+from scan_coordinator import ScanCoordinator
+from card_cache import get_photo_cache, get_card_cache
+from notifier import SubscriberRegistry, get_notifier, flush_notifier
 from aiogram.exceptions import TelegramBadRequest
 import logging
 
@@ -32,7 +37,10 @@ async def cmd_start(message: types.Message):
             "Вам доступні наступні команди:\n\n"
             "/laptops - перегляд всіх вигідних пропозицій на обрані ноутбуки\n"
             "/settings - налаштування пошуку, зміни чорного списку та інші налаштування\n"
-            "/scan - запуск сканування\n\n"
+            "/scan - запуск сканування\n"
+            "/subscribe - отримувати сповіщення про нові пропозиції в цей чат\n"
+            "/unsubscribe - відписатися від сповіщень\n"
+            "/filter - власний фільтр сповіщень (моделі, ціна, RAM, диск, Deal Score)\n\n"
             "За стандартними налаштуваннями, бот проводить пошук за обраними моделями "
             "і присилає повідомлення про нові пропозиції.\n"
             "Для зміни налаштувань використовуйте /settings"
@@ -44,54 +52,141 @@ async def cmd_start(message: types.Message):
 ### Блок хендлерів для керування меню ноутбуків ###
  
 
+def card_callback(action: str, laptops: LaptopBase, index: int = None) -> str:
+    """
+    Формує callback_data кнопки картки: дія, id оголошення та версія порядку
+    рядків. Без index кнопка веде на першу актуальну картку.
+    """
+    ad_id = laptops.id_at(index) if index is not None else ""
+    return f"{action}:{ad_id}:{laptops.data_version}"
+
+
+def resolve_card(data: str, laptops: LaptopBase) -> tuple[str, int | None, bool]:
+    """
+    Розбирає callback_data картки. Повертає дію, поточну позицію оголошення
+    (None, якщо його вже немає в базі) та чи не змінювався порядок рядків
+    з моменту створення кнопки.
+    """
+    action, _, rest = data.partition(':')
+    ad_id, _, version = rest.partition(':')
+
+    position = laptops.position_of(ad_id) if ad_id else None
+    return action, position, version == str(laptops.data_version)
+
+
+def render_card(index: int, laptops: LaptopBase) -> tuple[str, str, types.InlineKeyboardMarkup]:
+    """
+    Формує картку ноутбука: посилання на фото, текст із Deal Score, ціною
+    та медіаною і навігаційні кнопки. Нічого не змінює в базі.
+    """
+    is_new_prefix = "🔥 <b>НОВЕ!</b> " if laptops.is_new(index) else ""
+    
+    title = laptops['offer_title'][index]
+    price = laptops['price'][index]
+    score = laptops['deal_score'][index] * 100
+    median = laptops['median'][index]
+    link = laptops['link'][index]
+    photo = laptops['image_link'][index]
+
+    caption = (
+        f"{is_new_prefix}<b>{title}</b>\n\n" 
+        f"💰 Ціна: <b>{price}</b> zł\n" 
+        f"📊 На <b>{score:.0f}%</b> менша за медіану ({median} zł)"
+    )
+
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        InlineKeyboardButton(text="📝 Опис", callback_data=card_callback("descr", laptops, index)),
+        InlineKeyboardButton(text="🚫 Спам", callback_data=card_callback("spam", laptops, index)),
+        InlineKeyboardButton(text="🔗 OLX", url=link)
+    )
+
+    num_laptops = len(laptops)
+    nav_buttons = []
+    if index > 0:
+        nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=card_callback("back", laptops, index)))
+    if index < num_laptops - 1:
+        nav_buttons.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=card_callback("next", laptops, index)))
+    
+    if nav_buttons:
+        builder.row(*nav_buttons)
+
+
+    return photo, caption, builder.as_markup()
+
+
+def _card_key(index: int, laptops: LaptopBase) -> tuple:
+    return laptops.id_at(index), laptops.data_version, bool(laptops.is_new(index))
+
+
 def get_laptops_menu(index: int, laptops: LaptopBase) -> tuple[str, str, types.InlineKeyboardMarkup]:
     """
-    Генерує контентну картку ноутбука та інтерфейс керування.
-    Формує текст із Deal Score, ціною та медіаною. Створює навігаційні кнопки.
+    Повертає картку ноутбука з LRU готових карток і позначає її переглянутою.
+    Сусідні картки (попередня та наступна без спаму) рендеряться заздалегідь,
+    тож перегортання не витрачає час на формування тексту і кнопок.
     """
     try:
-        is_new_prefix = "🔥 <b>НОВЕ!</b> " if laptops.is_new(index) else ""
-        
-        title = laptops['offer_title'][index]
-        price = laptops['price'][index]
-        score = laptops['deal_score'][index] * 100
-        median = laptops['median'][index]
-        link = laptops['link'][index]
-        photo = laptops['image_link'][index]
-
-        caption = (
-            f"{is_new_prefix}<b>{title}</b>\n\n" 
-            f"💰 Ціна: <b>{price}</b> zł\n" 
-            f"📊 На <b>{score:.0f}%</b> менша за медіану ({median} zł)"
-        )
+        cards = get_card_cache()
 
-        builder = InlineKeyboardBuilder()
-        builder.row(
-            InlineKeyboardButton(text="📝 Опис", callback_data=f"descr:{index}"),
-            InlineKeyboardButton(text="🚫 Спам", callback_data=f"spam:{index}"),
-            InlineKeyboardButton(text="🔗 OLX", url=link)
-        )
-
-        num_laptops = len(laptops)
-        nav_buttons = []
-        if index > 0:
-            nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"back:{index - 1}"))
-        if index < num_laptops - 1:
-            nav_buttons.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=f"next:{index + 1}"))
-        
-        if nav_buttons:
-            builder.row(*nav_buttons)
+        key = _card_key(index, laptops)
+        card = cards.get(key)
+        if card is None:
+            card = render_card(index, laptops)
+            cards.put(key, card)
 
+        for neighbour in {laptops.get_valid_index(index + 1, 1), laptops.get_valid_index(index - 1, -1)} - {index}:
+            neighbour_key = _card_key(neighbour, laptops)
+            if neighbour_key not in cards:
+                cards.put(neighbour_key, render_card(neighbour, laptops))
 
         laptops.make_as_seen(index)
 
-        return photo, caption, builder.as_markup()
+        return card
     
     except Exception as e:
         logging.error(f"Критична помилка в get_laptops_menu на індексі {index}: {e}")
         return "", "Помилка формування картки.", InlineKeyboardBuilder().as_markup()
 
 
+async def answer_card_photo(message: types.Message, photo: str, caption: str, markup: types.InlineKeyboardMarkup) -> None:
+    """
+    Надсилає картку новим повідомленням. Фото береться за збереженим file_id,
+    якщо Telegram уже бачив це зображення, інакше — за посиланням OLX.
+    """
+    photos = get_photo_cache()
+    file_id = photos.get(photo)
+
+    try:
+        sent = await message.answer_photo(photo=file_id, caption=caption, reply_markup=markup, parse_mode="HTML")
+    except TelegramBadRequest as e:
+        if file_id == photo or "file" not in str(e).lower():
+            raise
+        #file_id став недійсним — надсилаємо з посилання і запам'ятовуємо новий
+        photos.forget(photo)
+        sent = await message.answer_photo(photo=photo, caption=caption, reply_markup=markup, parse_mode="HTML")
+
+    photos.remember(photo, sent)
+
+
+async def edit_card_photo(message: types.Message, photo: str, caption: str, markup: types.InlineKeyboardMarkup) -> None:
+    """
+    Замінює фото й текст у наявному повідомленні одним запитом edit_media,
+    використовуючи file_id з кешу замість посилання, коли він відомий.
+    """
+    photos = get_photo_cache()
+    file_id = photos.get(photo)
+
+    try:
+        edited = await message.edit_media(media=InputMediaPhoto(media=file_id, caption=caption, parse_mode="HTML"), reply_markup=markup)
+    except TelegramBadRequest as e:
+        if file_id == photo or "file" not in str(e).lower():
+            raise
+        photos.forget(photo)
+        edited = await message.edit_media(media=InputMediaPhoto(media=photo, caption=caption, parse_mode="HTML"), reply_markup=markup)
+
+    photos.remember(photo, edited)
+
+
 async def show_laptop_card(message: types.Message, index: int, laptops: LaptopBase) -> None:
     """
     Відображає повідомлення з фото та кнопками або повідомлення про відсутність даних.
@@ -105,7 +200,7 @@ async def show_laptop_card(message: types.Message, index: int, laptops: LaptopBa
 
         index = laptops.get_valid_index(index,-1)
         photo, caption, markup = get_laptops_menu(index, laptops)
-        await message.answer_photo(photo=photo, caption=caption, reply_markup=markup, parse_mode="HTML")
+        await answer_card_photo(message, photo, caption, markup)
     except Exception as e:
         logging.error(f"Помилка в show_laptop_card: {e}")
         await message.answer("Сталася помилка при відображенні картки ноутбука.")
@@ -125,21 +220,33 @@ async def cmd_laptop(message: types.Message, laptops: LaptopBase) -> None:
         logging.error(f"Помилка в cmd_laptop: {e}")
 
 
-@dp.callback_query(F.data.startswith("back"))
-@dp.callback_query(F.data.startswith("next"))
+@dp.callback_query(F.data.startswith("back:"))
+@dp.callback_query(F.data.startswith("next:"))
+@dp.callback_query(F.data.startswith("card:"))
 async def press_navigation(callback: types.CallbackQuery, laptops: LaptopBase):
     """
-    Обробляє кнопки "Назад" та "Вперед", оновлюючи поточне повідомлення (медіа та текст).
+    Обробляє кнопки "Назад", "Вперед" та повернення до картки, оновлюючи поточне
+    повідомлення (медіа та текст). Кнопка несе id оголошення, тож перехід
+    рахується від того ноутбука, який бачив користувач, навіть якщо база
+    встигла оновитись і пересортуватись.
     """
     try:
-        action, cur_index = callback.data.split(':')
-        direction = 1 if action == "next" else -1
-        index = laptops.get_valid_index(int(cur_index),direction)
+        action, position, fresh = resolve_card(callback.data, laptops)
+
+        if position is None:
+            index = laptops.get_valid_index(0, 1)
+        elif action == "next":
+            index = laptops.get_valid_index(position + 1, 1)
+        elif action == "back":
+            index = laptops.get_valid_index(position - 1, -1)
+        else:
+            index = laptops.get_valid_index(position, 1)
 
         photo, caption, markup = get_laptops_menu(index, laptops)
-        media = InputMediaPhoto(media=photo, caption=caption, parse_mode="HTML")
-        
-        await callback.message.edit_media(media=media, reply_markup=markup)
+        await edit_card_photo(callback.message, photo, caption, markup)
+
+        if not fresh and position is None:
+            await callback.answer("🔄 Список оновився, показую першу актуальну пропозицію.")
 
     except TelegramBadRequest:
         await callback.answer()
@@ -155,15 +262,18 @@ async def press_description(callback: types.CallbackQuery, laptops: LaptopBase):
     Замінює основний текст картки на повний опис товару з лімітом 1000 символів.
     """
     try:
-        index = int(callback.data.split(":")[1])
-        builder = InlineKeyboardBuilder().add(InlineKeyboardButton(text="⬆️ Повернутися", callback_data=f"next:{index}"))
+        _, index, _ = resolve_card(callback.data, laptops)
+        if index is None:
+            await callback.answer("⚠️ Цього оголошення вже немає в базі.", show_alert=True)
+            return
+
+        builder = InlineKeyboardBuilder().add(InlineKeyboardButton(text="⬆️ Повернутися", callback_data=card_callback("card", laptops, index)))
 
         description = str(laptops['description'][index])
         if len(description) > 1024:
             description ="Опис\n" + description[4:1000] + "..."
 
-        media = InputMediaPhoto(media=laptops['image_link'][index], caption=description, parse_mode="HTML")
-        await callback.message.edit_media(media=media, reply_markup=builder.as_markup())
+        await edit_card_photo(callback.message, laptops['image_link'][index], description, builder.as_markup())
     except Exception as e:
         logging.error(f"Помилка при відображенні опису: {e}")
         await callback.answer("⚠️ Не вдалося завантажити опис.")
@@ -171,15 +281,19 @@ async def press_description(callback: types.CallbackQuery, laptops: LaptopBase):
 
 
 @dp.callback_query(F.data.startswith("spam"))
-async def press_spam(callback: types.CallbackQuery):
+async def press_spam(callback: types.CallbackQuery, laptops: LaptopBase):
     """
     Викликає меню підтвердження для додавання оголошення в спам.
     """
     try:
-        index = int(callback.data.split(":")[1])
+        _, index, _ = resolve_card(callback.data, laptops)
+        if index is None:
+            await callback.answer("⚠️ Цього оголошення вже немає в базі.", show_alert=True)
+            return
+
         builder = InlineKeyboardBuilder()
-        builder.row(InlineKeyboardButton(text="✅ Так, в спам", callback_data=f"add_to_spam:{index}"))
-        builder.row(InlineKeyboardButton(text="❌ Ні, назад", callback_data=f"next:{index}"))
+        builder.row(InlineKeyboardButton(text="✅ Так, в спам", callback_data=card_callback("add_to_spam", laptops, index)))
+        builder.row(InlineKeyboardButton(text="❌ Ні, назад", callback_data=card_callback("card", laptops, index)))
 
         await callback.message.delete()
         await callback.message.answer(
@@ -195,14 +309,19 @@ async def press_spam(callback: types.CallbackQuery):
 @dp.callback_query(F.data.startswith("add_to_spam"))
 async def add_to_spam(callback: types.CallbackQuery, laptops: LaptopBase) -> None:
     """
-    Позначає товар як спам, зберігає зміни та повертає користувача до списку через паузу.
+    Позначає товар як спам (зміна одразу потрапляє в сховище) та повертає користувача до списку через паузу.
+    Оголошення шукається за id з кнопки, тож у спам завжди потрапляє саме те, яке підтвердив користувач.
     """
     try:
-        index = int(callback.data.split(":")[1])
+        _, index, _ = resolve_card(callback.data, laptops)
+        if index is None:
+            await callback.answer("⚠️ Цього оголошення вже немає в базі.", show_alert=True)
+            return
+
+        ad_id = laptops.id_at(index)
         title = laptops['offer_title'][index]
 
         laptops.add_to_spam(index)
-        laptops.save()
 
         if len(laptops) == 0:
             builder = InlineKeyboardBuilder()
@@ -217,10 +336,12 @@ async def add_to_spam(callback: types.CallbackQuery, laptops: LaptopBase) -> Non
         await asyncio.sleep(3) 
 
     
-        new_index = laptops.get_valid_index(index,-1)
+        #за час паузи база могла оновитись, тому позицію шукаємо заново
+        index = laptops.position_of(ad_id)
+        new_index = laptops.get_valid_index(index if index is not None else 0, -1 if index is not None else 1)
 
         photo, caption, markup = get_laptops_menu(new_index, laptops)
-        await callback.message.answer_photo(photo=photo, caption=caption, reply_markup=markup, parse_mode="HTML")
+        await answer_card_photo(callback.message, photo, caption, markup)
         await callback.message.delete()
 
     except Exception as e:
@@ -453,29 +574,34 @@ async def cmd_scan(message: types.Message) -> None:
 
    
 @dp.callback_query(F.data == "process_scan")
-async def process_scan(callback: types.CallbackQuery, laptops: LaptopBase) -> None:
-    """Запускає скрапер у фоновому потоці, щоб не блокувати роботу бота."""
+async def process_scan(callback: types.CallbackQuery, laptops: LaptopBase, scans: ScanCoordinator) -> None:
+    """
+    Запускає конвеєр сканування в циклі бота, не блокуючи обробку інших команд.
+    Якщо сканування вже йде (інший користувач або планувальник), приєднується
+    до нього. Поки чекаємо, в повідомленні оновлюється хід сканування.
+    """
     try:
-        from scraper import run_scraper
-        from analysis_engine import find_hot_deals
-
-        await callback.message.edit_text(
-            text="🔍 <b>Пошук почався...</b>\nЯ перевіряю OLX на наявність нових ноутбуків. Як тільки закінчу — покажу результат.",
-            parse_mode="HTML"
+        header = (
+            "🔍 <b>Сканування вже триває, приєднуюсь...</b>" if scans.running
+            else "🔍 <b>Пошук почався...</b>\nЯ перевіряю OLX на наявність нових ноутбуків. Як тільки закінчу — покажу результат."
         )
-
-        success = await asyncio.to_thread(run_scraper)
+        await callback.message.edit_text(text=header, parse_mode="HTML")
+
+        scan = asyncio.ensure_future(scans.run())
+        shown = None
+        while not scan.done():
+            await asyncio.wait({scan}, timeout=5)
+            text = f"{header}\n\n{scans.progress.describe()}" if scans.progress else header
+            if not scan.done() and text != shown:
+                try:
+                    await callback.message.edit_text(text=text, parse_mode="HTML")
+                    shown = text
+                except TelegramBadRequest:
+                    pass
+
+        success = scan.result()
 
         if success:
-            await asyncio.to_thread(find_hot_deals)
-            
-            laptops.update()
-                
-            if not laptops.df.empty and 'is_new' in laptops.df.columns:
-                laptops.df = laptops.df.sort_values(by='is_new', ascending=False)
-                laptops.df.reset_index(drop=True, inplace=True)
-                logging.info("Дані відсортовані: нові оголошення вгорі.")
-
             logging.info(f"Серед них нових: {len(laptops.df[laptops.df['is_new']==True])}!")
             
             if len(laptops) > 0:
@@ -512,6 +638,61 @@ async def close(callback: types.CallbackQuery) -> None:
 
 
 
+@dp.message(Command("subscribe"))
+async def cmd_subscribe(message: types.Message, config: ConfigManager) -> None:
+    """Додає поточний чат до отримувачів сповіщень про нові пропозиції."""
+    try:
+        if SubscriberRegistry(config).add(message.chat.id):
+            await message.answer("🔔 Чат підписано на сповіщення про нові вигідні пропозиції.")
+        else:
+            await message.answer("Цей чат уже отримує сповіщення.")
+    except Exception as e:
+        logging.error(f"Помилка в cmd_subscribe: {e}")
+
+
+@dp.message(Command("unsubscribe"))
+async def cmd_unsubscribe(message: types.Message, config: ConfigManager) -> None:
+    """Прибирає поточний чат з отримувачів сповіщень."""
+    try:
+        if SubscriberRegistry(config).remove(message.chat.id):
+            await message.answer("🔕 Сповіщення для цього чату вимкнено.")
+        else:
+            await message.answer("Цей чат не був підписаний на сповіщення.")
+    except Exception as e:
+        logging.error(f"Помилка в cmd_unsubscribe: {e}")
+
+
+@dp.message(Command("filter"))
+async def cmd_filter(message: types.Message, config: ConfigManager) -> None:
+    """
+    Показує або змінює фільтр сповіщень поточного чату:
+    /filter models="macbook pro",thinkpad max_price=4000 min_ram=16 min_disk=512
+            min_score=0.2 max_score=0.5 exclude=uszkodzony,bios
+    Назва моделі відповідає всім моделям з налаштувань, що її містять.
+    Значення "-" знімає обмеження, /filter reset — скидає фільтр повністю.
+    """
+    try:
+        from subscriptions import SubscriptionFilter, parse_filter_args
+
+        registry = SubscriberRegistry(config)
+        args = (message.text or "").split(maxsplit=1)[1:]
+
+        if args and args[0].strip() == "reset":
+            registry.set_settings(message.chat.id, {})
+        elif args:
+            try:
+                settings = parse_filter_args(args[0], registry.settings(message.chat.id), config.data.get('models', []))
+            except ValueError as e:
+                await message.answer(f'⚠️ {e}\nПриклад: /filter models="macbook pro",thinkpad max_price=4000 min_ram=16')
+                return
+            registry.set_settings(message.chat.id, settings)
+
+        current = SubscriptionFilter.from_dict(registry.settings(message.chat.id))
+        await message.answer(f"🎯 Фільтр сповіщень для цього чату:\n\n{current.describe()}")
+    except Exception as e:
+        logging.error(f"Помилка в cmd_filter: {e}")
+
+
 @dp.message()
 async def get_my_id(message: types.Message, config: ConfigManager):
     """
@@ -525,33 +706,54 @@ async def get_my_id(message: types.Message, config: ConfigManager):
 
 ### Функція оповіщення про нові пропозиції ###
 
-async def notify_users_new_deals(bot: Bot, config: ConfigManager, laptops: LaptopBase) -> None:
+async def notify_users_new_deals(bot: Bot, config: ConfigManager, laptops: LaptopBase, deal_ids: list) -> None:
     """
     Функція для фонового планувальника (scheduler). 
-    Надсилає повідомлення-тригер, якщо знайдено нові ноутбуки.
+    Ставить у чергу повідомлення-тригер для підписаних чатів про пропозиції
+    deal_ids, які сканування щойно додало в базу (ScanProgress.new_deal_ids);
+    вже оголошені раніше не повторюються. Кожен чат отримує лише ті
+    пропозиції, що проходять його фільтр (див. subscriptions.py). Саме
+    надсилання з урахуванням лімітів Telegram іде у фоні.
     """
     try:
+        if not deal_ids:
+            return
 
         laptops.update()
 
-        chat_id = config.data.get('chat_id')
-        if not chat_id:
-            logging.warning("Сповіщення не надіслано: chat_id не встановлено в конфігу.")
+        notifier = get_notifier(bot, config)
+        chat_ids = notifier.registry.chat_ids()
+        if not chat_ids:
+            logging.warning("Сповіщення не надіслано: немає chat_id адміна та підписаних чатів.")
             return
 
-        new_count = len(laptops.df[laptops.df['is_new'] == True]) if not laptops.df.empty else 0
+        if laptops.df.empty:
+            return
 
-        if new_count > 0:
-            builder = InlineKeyboardBuilder()
-            builder.row(InlineKeyboardButton(text="🔥 Переглянути нові знахідки", callback_data=f"next:{0}"))
+        new_deals = laptops.df[laptops.df['id'].isin(deal_ids)].reset_index(drop=True)
+        if new_deals.empty:
+            return
+
+        from subscriptions import SubscriptionIndex
+        matches = SubscriptionIndex.from_registry(notifier.registry).match_frame(new_deals)
 
-            await bot.send_message(
-                chat_id=chat_id, 
-                text=f"📢 <b>Знайдено {new_count} нових вигідних пропозицій!</b>\nНатисніть кнопку нижче, щоб переглянути.",
-                reply_markup=builder.as_markup(),
-                parse_mode="HTML"
+        builder = InlineKeyboardBuilder()
+        builder.row(InlineKeyboardButton(text="🔥 Переглянути нові знахідки", callback_data=card_callback("card", laptops)))
+        markup = builder.as_markup()
+
+        for chat_id, positions in matches.items():
+            lines = [
+                f"• {escape(str(new_deals['offer_title'][pos]))} — <b>{new_deals['price'][pos]}</b> zł"
+                for pos in positions[:5]
+            ]
+            text = (
+                f"📢 <b>Знайдено {len(positions)} нових вигідних пропозицій!</b>\n"
+                + "\n".join(lines)
+                + "\n\nНатисніть кнопку нижче, щоб переглянути."
             )
-            logging.info(f"Надіслано сповіщення про {new_count} нових ноутбуків.")
+            notifier.submit(chat_id, text, reply_markup=markup, parse_mode="HTML")
+
+        logging.info(f"Сповіщення про {len(new_deals)} нових ноутбуків поставлено в чергу для {len(matches)} з {len(chat_ids)} чатів.")
             
     except Exception as e:
         logging.error(f"Помилка в notify_users_new_deals: {e}")
@@ -559,20 +761,34 @@ async def notify_users_new_deals(bot: Bot, config: ConfigManager, laptops: Lapto
 
 async def main():
 
-    laptops = LaptopBase('data/hot_deals.csv')
-
     config = ConfigManager()
 
+    laptops = LaptopBase(config=config)
+
     TOKEN = config.data['token']
 
     bot = Bot(token=TOKEN)
 
+    sink = PersistenceSink()
+
+    photos = get_photo_cache(config)
+    get_card_cache(config)
+
     app_data = {
     "laptops": laptops,
-    "config": config
+    "config": config,
+    "sink": sink,
+    "scans": ScanCoordinator(laptops, config, sink)
     }
     
-    await dp.start_polling(bot,**app_data)
+    try:
+        await dp.start_polling(bot, close_bot_session=False, **app_data)
+    finally:
+        await sink.flush()
+        laptops.flush()
+        photos.flush()
+        await flush_notifier(config.data.get('notify_shutdown_timeout', 10))
+        await bot.session.close()
 
 if __name__ == "__main__":
     asyncio.run(main())